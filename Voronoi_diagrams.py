@@ -3,82 +3,79 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import geopandas as gpd
 from shapely.geometry import Point, Polygon
-from scipy.spatial import Voronoi, voronoi_plot_2d
-import numpy as np
-import random
+from accident_data import accidents_to_gdf
+from accident_index import load_accident_index
+from edge_snapping import snap_points
+from osm_cache import load_road_graph
+from marathon_loops import find_loops
+from network_voronoi import NetworkVoronoi, nearest_seed_nodes
+from study_area import AreaFilter, hull_from_nodes
 
-# --- Load road network ---
-city_center = (53.8008, -1.5491)  # Leeds city centre
-G = ox.graph_from_point(city_center, dist=6000, network_type='walk', simplify=True)
-nodes, edges = ox.graph_to_gdfs(G)
+# Guarded so that the loop search's worker processes, which re-import this script under the
+# spawn start method (Windows, macOS), do not rerun it
+if __name__ == "__main__":
+    # Set folder path where the accident CSV files are stored
+    folder_path = "C:/Users/86153/Downloads/"
 
-# --- 1. Select 4 seed points ---
-# Criteria: Evenly spread out locations far from known accident clusters (mock for now)
-# These are manually chosen for diversity
-seed_coords = [
-    (53.835, -1.55),  # North Leeds
-    (53.795, -1.5),   # East Leeds
-    (53.76, -1.56),   # South Leeds
-    (53.79, -1.61)    # West Leeds
-]
+    # --- Load road network ---
+    city_center = (53.8008, -1.5491)  # Leeds city centre
+    G = load_road_graph(city_center, dist=6000, network_type='walk', simplify=True)  # cached after first download
+    nodes, edges = ox.graph_to_gdfs(G)
 
-seed_points = [Point(lon, lat) for lat, lon in seed_coords]
-seeds_gdf = gpd.GeoDataFrame(geometry=seed_points, crs='EPSG:4326')
+    # --- 1. Select 4 seed points ---
+    # Criteria: Evenly spread out locations far from known accident clusters (mock for now)
+    # These are manually chosen for diversity
+    seed_coords = [
+        (53.835, -1.55),  # North Leeds
+        (53.795, -1.5),   # East Leeds
+        (53.76, -1.56),   # South Leeds
+        (53.79, -1.61)    # West Leeds
+    ]
 
-# --- 2. Generate Voronoi diagram ---
-# Project to UTM for planar computations
-seeds_proj = seeds_gdf.to_crs(epsg=27700)
-points_proj = np.array([[p.x, p.y] for p in seeds_proj.geometry])
-vor = Voronoi(points_proj)
+    seed_points = [Point(lon, lat) for lat, lon in seed_coords]
+    seeds_gdf = gpd.GeoDataFrame(geometry=seed_points, crs='EPSG:4326')
 
-# Plot Voronoi diagram
-fig, ax = plt.subplots(figsize=(10, 10))
-seeds_proj.plot(ax=ax, color='red')
-voronoi_plot_2d(vor, ax=ax, show_vertices=False, line_colors='blue')
-plt.title("Voronoi Diagram for 4 Marathon Zones in Leeds")
-plt.show()
+    # --- 2. Partition the road network into network Voronoi cells ---
+    # Snap all seeds to their nearest graph nodes in one call
+    seed_node_ids = nearest_seed_nodes(G, seeds_gdf.geometry.x, seeds_gdf.geometry.y)
+    # Every node joins the seed it reaches first along the roads (one multi-source Dijkstra,
+    # see network_voronoi.py); mode="euclidean" on a projected graph gives straight-line cells
+    voronoi = NetworkVoronoi(G, seed_node_ids)
 
-# --- 3. Find loops of ~42km starting and ending at seed nodes ---
-def find_circuit(G, center_node, target_length_km=42, tolerance=2):
-    paths = []
-    for _ in range(100):
-        path = [center_node]
-        total_length = 0
-        current_node = center_node
-        while total_length < (target_length_km * 1000):
-            neighbors = list(G.neighbors(current_node))
-            if not neighbors:
-                break
-            next_node = random.choice(neighbors)
-            try:
-                edge_length = G[current_node][next_node][0]['length']
-            except:
-                edge_length = G[current_node][next_node]['length']
-            total_length += edge_length
-            path.append(next_node)
-            current_node = next_node
-            if current_node == center_node and abs(total_length - target_length_km * 1000) < tolerance * 1000:
-                paths.append((path, total_length))
-                break
-    return paths
+    # Snap the accidents inside the study area to road edges and count them per cell
+    G_proj = load_road_graph(city_center, dist=6000, network_type='walk', simplify=True, projected=True)  # cached too
+    accident_points = accidents_to_gdf(load_accident_index(folder_path).frame, crs=G_proj.graph["crs"])
+    accident_points = AreaFilter(accident_points).within(hull_from_nodes(G_proj))
+    snapped = snap_points(G_proj, accident_points.geometry.x.to_numpy(), accident_points.geometry.y.to_numpy())
+    print("Network Voronoi cell statistics:")
+    print(voronoi.cell_stats(snapped))
 
-# Find closest nodes to seed points
-seed_node_ids = [ox.nearest_nodes(G, point.x, point.y) for point in seeds_gdf.geometry]
+    # Plot the network Voronoi cells
+    fig, ax = plt.subplots(figsize=(10, 10))
+    nodes.assign(cell=voronoi.node_cells()).plot(ax=ax, column='cell', categorical=True, markersize=1, legend=True)
+    seeds_gdf.plot(ax=ax, color='red')
+    plt.title("Network Voronoi Cells for 4 Marathon Zones in Leeds")
+    plt.show()
 
-fig, ax = plt.subplots(figsize=(12, 12))
-nodes.plot(ax=ax, markersize=1, color='gray')
-edges.plot(ax=ax, linewidth=0.5, color='lightgray')
-colors = ['red', 'green', 'blue', 'purple']
+    # --- 3. Find loops of ~42km starting and ending at seed nodes ---
+    fig, ax = plt.subplots(figsize=(12, 12))
+    nodes.plot(ax=ax, markersize=1, color='gray')
+    edges.plot(ax=ax, linewidth=0.5, color='lightgray')
+    colors = ['red', 'green', 'blue', 'purple']
 
-for i, node_id in enumerate(seed_node_ids):
-    circuits = find_circuit(G, node_id)
-    if circuits:
-        path, length = circuits[0]
-        ox.plot_graph_route(G, path, route_color=colors[i], route_linewidth=2, node_size=0, show=False, close=False, ax=ax)
-        print(f"✅ Cell {i+1}: Found path of {length/1000:.2f} km")
-    else:
-        print(f"❌ Cell {i+1}: No path found close to 42 km")
+    # Search all seeds in parallel, 60 s each, keeping every loop inside its own network Voronoi
+    # cell; loops are ranked by length error and road quality
+    cells = [voronoi.cell_nodes(i) for i in range(len(voronoi))]
+    all_loops = find_loops(G, seed_node_ids, cells=cells, target_length=42000, tolerance=2000, time_budget=60, seed=42)
 
-plt.title("Marathon Loops within Voronoi Cells")
-plt.show()
+    for i, loops in enumerate(all_loops):
+        if loops:
+            path, length = loops[0]["path"], loops[0]["length"]
+            ox.plot_graph_route(G, path, route_color=colors[i], route_linewidth=2, node_size=0, show=False, close=False, ax=ax)
+            print(f"✅ Cell {i+1}: Found path of {length/1000:.2f} km (road quality {loops[0]['quality']:.2f})")
+        else:
+            print(f"❌ Cell {i+1}: No path found close to 42 km")
+
+    plt.title("Marathon Loops within Voronoi Cells")
+    plt.show()
 
@@ -0,0 +1,185 @@
+# accident_data.py
+# Shared ingestion of the Leeds road accident CSVs.
+#
+# The yearly files use different schemas: 2014/2015 store categories as text, 2018/2019 store
+# the codes described in accidentsguidance.csv, and RTC2018 names its key column
+# 'Accident Fields_Reference Number'. load_accidents maps every file onto one typed schema
+# (categorical dtypes with decoded labels), and caches the result as Parquet (or a pickle
+# when pyarrow is not installed) keyed by a hash of the source files, so later runs skip
+# parsing altogether. accidents_to_gdf builds point geometries in one vectorized call.
+
+import hashlib
+import os
+import pandas as pd
+import geopandas as gpd
+
+ACCIDENT_FILES = [
+    "2014.csv",
+    "2015.csv",
+    "RTC2018_Leeds.csv",
+    "Trafficaccidents_2019_Leeds.csv"
+]
+GUIDANCE_FILE = "accidentsguidance.csv"
+
+# The CSVs are Windows-1252 (byte 0x96 is an en dash in labels such as "Fog or mist – if hazard")
+ENCODING = "cp1252"
+
+# Bump when the normalized schema changes, to invalidate old caches
+SCHEMA_VERSION = 2
+
+# Source column -> normalized column, for columns whose values are the same in every year
+NUMERIC_COLUMNS = {
+    "Grid Ref: Easting": "easting",
+    "Grid Ref: Northing": "northing",
+    "Number of Vehicles": "number_of_vehicles",
+    "Time (24hr)": "time_24hr",
+    "Age of Casualty": "age_of_casualty"
+}
+
+# Source column -> normalized column, for columns coded in accidentsguidance.csv
+CATEGORICAL_COLUMNS = {
+    "1st Road Class": "road_class",
+    "Road Surface": "road_surface",
+    "Lighting Conditions": "lighting_conditions",
+    "Weather Conditions": "weather_conditions",
+    "Casualty Class": "casualty_class",
+    "Casualty Severity": "casualty_severity",
+    "Sex of Casualty": "sex_of_casualty",
+    "Type of Vehicle": "vehicle_type"
+}
+
+# Text spellings in the 2014/2015 files that differ from the guidance labels
+LABEL_ALIASES = {
+    "casualty_class": {
+        "Driver": "Driver or rider",
+        "Driver/Rider": "Driver or rider",
+        "Passenger": "Vehicle or pillion passenger"
+    }
+}
+
+REFERENCE_COLUMNS = ["Reference Number", "Accident Fields_Reference Number"]
+DATE_FORMATS = ["%d/%m/%Y", "%d-%b-%y"]
+
+
+def read_guidance(path=GUIDANCE_FILE):
+    """
+    Parses accidentsguidance.csv into {source column: {code: label}}.
+    The file is a sequence of two-column blocks separated by a blank ',' line.
+    """
+    lookups, field = {}, None
+    with open(path, encoding=ENCODING) as f:
+        for line in f:
+            code, _, label = line.rstrip("\r\n").partition(",")
+            if not code and not label:
+                field = None
+            elif field is None:
+                field = code
+                lookups[field] = {}
+            elif code.strip().isdigit():
+                lookups[field][int(code)] = label.strip()
+    return lookups
+
+
+def _parse_dates(values):
+    dates = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        missing = dates.isna()
+        dates[missing] = pd.to_datetime(values[missing], format=fmt, errors="coerce")
+    return dates
+
+
+def normalize_accidents(df, source, guidance):
+    """
+    Maps one raw accident file onto the normalized schema (categories still as plain labels).
+    """
+    out = pd.DataFrame(index=df.index)
+    reference = next(c for c in REFERENCE_COLUMNS if c in df.columns)
+    out["reference_number"] = df[reference].astype(str).str.strip()
+    for column, name in NUMERIC_COLUMNS.items():
+        out[name] = pd.to_numeric(df[column], errors="coerce")
+    out["accident_date"] = _parse_dates(df["Accident Date"].astype(str).str.strip())
+    out["road_number"] = df["1st Road Class & No"].astype(str).str.strip() if "1st Road Class & No" in df else None
+
+    for column, name in CATEGORICAL_COLUMNS.items():
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            labels = values.map(guidance.get(column, {}))
+        else:
+            labels = values.astype("string").str.strip().replace(LABEL_ALIASES.get(name, {}))
+        out[name] = labels.astype(object)
+
+    out["year"] = out["accident_date"].dt.year
+    out["source"] = source
+    return out
+
+
+def _finalize_types(df, guidance):
+    for column, name in CATEGORICAL_COLUMNS.items():
+        known = list(guidance.get(column, {}).values())
+        extra = sorted(set(df[name].dropna()) - set(known))
+        df[name] = pd.Categorical(df[name], categories=list(dict.fromkeys(known)) + extra)
+    for name in ["number_of_vehicles", "time_24hr", "age_of_casualty", "year"]:
+        df[name] = df[name].astype("Int16")
+    df["source"] = df["source"].astype("category")
+    return df
+
+
+def source_hash(paths):
+    """
+    Short content hash of the given files and the schema version, used as a cache key.
+    """
+    digest = hashlib.sha256(f"schema-{SCHEMA_VERSION}".encode())
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def load_accidents(folder_path="", file_names=ACCIDENT_FILES, guidance_file=GUIDANCE_FILE, cache_dir=".cache"):
+    """
+    Loads and normalizes the accident files, reusing the cached table when none of the
+    source files (or the guidance file) has changed. cache_dir=None disables caching.
+    """
+    paths = [os.path.join(folder_path, name) for name in file_names]
+    guidance_path = os.path.join(folder_path, guidance_file)
+
+    cache_path = None
+    if cache_dir is not None:
+        suffix = ".parquet" if _parquet_available() else ".pkl"
+        cache_path = os.path.join(cache_dir, f"accidents-{source_hash(paths + [guidance_path])}{suffix}")
+        if os.path.exists(cache_path):
+            return pd.read_parquet(cache_path) if suffix == ".parquet" else pd.read_pickle(cache_path)
+
+    guidance = read_guidance(guidance_path)
+    frames = [normalize_accidents(pd.read_csv(path, encoding=ENCODING), os.path.basename(path), guidance)
+              for path in paths]
+    accidents = _finalize_types(pd.concat(frames, ignore_index=True), guidance)
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        if cache_path.endswith(".parquet"):
+            accidents.to_parquet(cache_path)
+        else:
+            accidents.to_pickle(cache_path)
+    return accidents
+
+
+def accidents_to_gdf(accidents, crs="EPSG:4326"):
+    """
+    GeoDataFrame of accidents with valid grid references, with points built in one vectorized
+    call from the British National Grid coordinates (EPSG:27700) and reprojected to `crs`.
+    """
+    accidents = accidents.dropna(subset=["easting", "northing"])
+    geometry = gpd.points_from_xy(accidents["easting"], accidents["northing"], crs="EPSG:27700")
+    gdf = gpd.GeoDataFrame(accidents, geometry=geometry, crs="EPSG:27700")
+    return gdf if crs is None else gdf.to_crs(crs)
@@ -0,0 +1,151 @@
+# accident_index.py
+# Persistent spatio-temporal index over the normalized accident table.
+#
+# Questions such as "serious accidents on A roads, wet surface, within 500 m of this junction,
+# 2018-2019" used to mean rereading and refiltering every CSV. AccidentIndex combines
+#   - a KD-tree over the British National Grid coordinates (radius and bounding-box queries),
+#   - the accident dates in sorted order (date ranges by binary search),
+#   - one packed bitmap per label of every categorical column (severity, road class, ...),
+# and answers a query by AND-ing bitmaps, so results come back in milliseconds. The index is
+# pickled next to the accident cache, keyed by the same source-file hash.
+
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from accident_data import ACCIDENT_FILES, CATEGORICAL_COLUMNS, GUIDANCE_FILE, load_accidents, source_hash
+
+
+class AccidentIndex:
+    """
+    Query index over an accident table from accident_data.load_accidents. Coordinates given to
+    queries are eastings/northings in metres (EPSG:27700), dates anything pandas can parse.
+    """
+
+    def __init__(self, accidents):
+        self.frame = accidents.dropna(subset=["easting", "northing"]).reset_index(drop=True)
+        self.size = len(self.frame)
+        self.tree = cKDTree(self.frame[["easting", "northing"]].to_numpy(dtype=float))
+
+        dates = self.frame["accident_date"].to_numpy(dtype="datetime64[ns]")
+        self.date_order = np.argsort(dates, kind="stable")
+        self.sorted_dates = dates[self.date_order]
+
+        self.bitmaps = {}
+        for name in CATEGORICAL_COLUMNS.values():
+            codes = self.frame[name].cat.codes.to_numpy()
+            self.bitmaps[name] = {
+                label: np.packbits(codes == code)
+                for code, label in enumerate(self.frame[name].cat.categories)
+            }
+
+    # --- Building blocks, each returning a packed bitmap over the rows ---
+
+    def _from_positions(self, positions):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def _all(self):
+        return np.packbits(np.ones(self.size, dtype=bool))
+
+    def within_radius(self, center, radius):
+        return self._from_positions(self.tree.query_ball_point(center, radius))
+
+    def within_bbox(self, bbox):
+        """
+        bbox = (min_easting, min_northing, max_easting, max_northing)
+        """
+        min_x, min_y, max_x, max_y = bbox
+        center = ((min_x + max_x) / 2, (min_y + max_y) / 2)
+        # Chebyshev ball around the box centre, then trim to the exact rectangle
+        candidates = np.asarray(self.tree.query_ball_point(center, max(max_x - min_x, max_y - min_y) / 2, p=np.inf), dtype=np.int64)
+        xy = self.tree.data[candidates]
+        inside = (xy[:, 0] >= min_x) & (xy[:, 0] <= max_x) & (xy[:, 1] >= min_y) & (xy[:, 1] <= max_y)
+        return self._from_positions(candidates[inside])
+
+    def between_dates(self, start=None, end=None):
+        """
+        Rows dated within [start, end], both inclusive (an end date covers the whole day).
+        """
+        lo = 0 if start is None else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(start)), side="left")
+        if end is None:
+            hi = self.size
+        else:
+            end = pd.Timestamp(end)
+            if end == end.normalize():
+                end = end + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+            hi = np.searchsorted(self.sorted_dates, np.datetime64(end), side="right")
+        return self._from_positions(self.date_order[lo:hi])
+
+    def matching(self, column, values):
+        """
+        Rows whose `column` label is any of `values` (a label or a list of labels).
+        """
+        if isinstance(values, str) or not hasattr(values, "__iter__"):
+            values = [values]
+        bitmaps = self.bitmaps[column]
+        unknown = [v for v in values if v not in bitmaps]
+        if unknown:
+            raise KeyError(f"Unknown {column} labels {unknown}; expected some of {list(bitmaps)}")
+        result = np.zeros_like(self._all())
+        for value in values:
+            result |= bitmaps[value]
+        return result
+
+    # --- Query API ---
+
+    def query_positions(self, center=None, radius=None, bbox=None, start=None, end=None, **filters):
+        """
+        Row positions matching every given condition. `filters` maps categorical columns
+        (road_class, casualty_severity, road_surface, weather_conditions, ...) to labels.
+        """
+        result = self._all()
+        if center is not None:
+            if radius is None:
+                raise ValueError("A radius is required with a center")
+            result &= self.within_radius(center, radius)
+        if bbox is not None:
+            result &= self.within_bbox(bbox)
+        if start is not None or end is not None:
+            result &= self.between_dates(start, end)
+        for column, values in filters.items():
+            result &= self.matching(column, values)
+        return np.flatnonzero(np.unpackbits(result, count=self.size))
+
+    def query(self, **conditions):
+        """
+        Matching accidents as a DataFrame, e.g.
+        index.query(center=(430000, 433500), radius=500, start="2018-01-01", end="2019-12-31",
+                    casualty_severity=["Serious", "Fatal"], road_class="A", road_surface="Wet / Damp")
+        """
+        return self.frame.iloc[self.query_positions(**conditions)]
+
+    # --- Persistence ---
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def load_accident_index(folder_path="", file_names=ACCIDENT_FILES, guidance_file=GUIDANCE_FILE, cache_dir=".cache"):
+    """
+    Returns the persisted index for the current accident files, building it on first use
+    (cache_dir=None builds it without persisting anything).
+    """
+    if cache_dir is None:
+        return AccidentIndex(load_accidents(folder_path, file_names, guidance_file, None))
+    paths = [os.path.join(folder_path, name) for name in file_names] + [os.path.join(folder_path, guidance_file)]
+    index_path = os.path.join(cache_dir, f"accident-index-{source_hash(paths)}.pkl")
+    if os.path.exists(index_path):
+        return AccidentIndex.load(index_path)
+    index = AccidentIndex(load_accidents(folder_path, file_names, guidance_file, cache_dir))
+    index.save(index_path)
+    return index
@@ -0,0 +1,257 @@
+# benchmark.py
+# Offline benchmark harness with synthetic, scalable inputs for every stage.
+#
+# The repository only ships fixed CSVs, and the spatial scripts need OSM downloads, so there
+# was no way to measure regressions or scaling. The generators here produce
+#   - thread/user tables in the ADMINISTRATORS schema with Zipf-skewed activity,
+#   - grid or random planar (Delaunay) road graphs in OSMnx form (x/y nodes, 'length' edges,
+#     both directions, graph CRS),
+#   - accident point clouds scattered around the road edges,
+# and each stage is timed (best of `repeat` runs) and then run once more under tracemalloc
+# for its peak Python/NumPy allocation. Stages run in-process (processes=1) so the memory
+# figures are complete. Results are written as JSON; --compare prints speedups against an
+# earlier result file.
+#
+#   python benchmark.py --sizes 2000 20000 --repeat 3
+#   python benchmark.py --stages build_network snapping --compare .cache/benchmarks/old.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy.spatial import Delaunay
+
+OUTPUT_DIR = os.path.join(".cache", "benchmarks")
+
+STAGES = ("build_network", "compute_network_metrics", "simulate_trolling_spread", "prioritize_editors",
+          "snapping", "find_circuit")
+
+
+# --- Synthetic data ---
+
+def _zipf_weights(n, skew):
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def synthetic_threads(n_rows, n_users=None, n_threads=None, skew=1.1, seed=0):
+    """
+    Posts in the ADMINISTRATORS schema (thread_subject, username, page_name). User activity and
+    thread sizes follow Zipf laws with exponent `skew`; threads are spread over monthly archives.
+    """
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(2, n_rows // 8)
+    n_threads = n_threads or max(1, n_rows // 3)
+    users = rng.choice(n_users, size=n_rows, p=_zipf_weights(n_users, skew))
+    threads = rng.choice(n_threads, size=n_rows, p=_zipf_weights(n_threads, skew))
+    months = rng.integers(0, 120, size=n_threads)
+    page_names = np.array([f"WikidataAdministratorsnoticeboardArchive{2012 + m // 12}{m % 12 + 1:02d}.json"
+                           for m in months])
+    return pd.DataFrame({
+        "thread_subject": [f" Thread {t} " for t in threads],
+        "username": [f"User{u}" for u in users],
+        "page_name": page_names[threads]
+    })
+
+
+def _road_graph(xy, pairs, seed, crs):
+    rng = np.random.default_rng(seed)
+    highways = np.array(["residential", "footway", "tertiary", "primary", "service"])
+    G = nx.MultiDiGraph(crs=crs)
+    for i, (x, y) in enumerate(xy):
+        G.add_node(i, x=float(x), y=float(y))
+    for u, v in pairs:
+        length = float(np.hypot(*(xy[u] - xy[v])))
+        highway = str(rng.choice(highways))
+        G.add_edge(int(u), int(v), length=length, highway=highway, oneway=False)
+        G.add_edge(int(v), int(u), length=length, highway=highway, oneway=False)
+    return G
+
+
+def grid_road_graph(rows, cols, spacing=100.0, jitter=0.1, drop=0.1, origin=(429000.0, 433000.0),
+                    crs="EPSG:27700", seed=0):
+    """
+    Jittered grid street network in OSMnx form (projected coordinates in metres), with a
+    fraction `drop` of the blocks' edges removed.
+    """
+    rng = np.random.default_rng(seed)
+    jj, ii = np.meshgrid(np.arange(cols), np.arange(rows))
+    xy = np.column_stack([jj.ravel(), ii.ravel()]) * spacing + np.asarray(origin)
+    xy = xy + rng.normal(0, jitter * spacing, size=xy.shape)
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    pairs = np.vstack([np.column_stack([ids[:, :-1].ravel(), ids[:, 1:].ravel()]),
+                       np.column_stack([ids[:-1, :].ravel(), ids[1:, :].ravel()])])
+    pairs = pairs[rng.random(len(pairs)) >= drop]
+    return _road_graph(xy, pairs, seed, crs)
+
+
+def planar_road_graph(n_nodes, extent=5000.0, keep=0.6, origin=(429000.0, 433000.0), crs="EPSG:27700", seed=0):
+    """
+    Random planar street network: a Delaunay triangulation of random points, thinned to a
+    fraction `keep` of its edges (keeping a spanning tree so the graph stays connected).
+    """
+    rng = np.random.default_rng(seed)
+    xy = rng.random((n_nodes, 2)) * extent + np.asarray(origin)
+    triangles = Delaunay(xy).simplices
+    pairs = np.vstack([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [0, 2]]])
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    T = nx.Graph()
+    T.add_weighted_edges_from((u, v, np.hypot(*(xy[u] - xy[v]))) for u, v in pairs)
+    tree = {tuple(sorted(e)) for e in nx.minimum_spanning_edges(T, data=False)}
+    keep_mask = np.array([(u, v) in tree for u, v in pairs]) | (rng.random(len(pairs)) < keep)
+    return _road_graph(xy, pairs[keep_mask], seed, crs)
+
+
+def synthetic_accidents(G, n_points, spread=15.0, seed=0):
+    """
+    Accident coordinates (x, y) scattered with Gaussian noise around random points on random edges.
+    """
+    rng = np.random.default_rng(seed)
+    edges = np.array([(u, v) for u, v in G.edges()])
+    picks = edges[rng.integers(0, len(edges), size=n_points)]
+    x = np.array([G.nodes[n]["x"] for n in G.nodes])
+    y = np.array([G.nodes[n]["y"] for n in G.nodes])
+    index = {n: i for i, n in enumerate(G.nodes)}
+    u = np.array([index[n] for n in picks[:, 0]])
+    v = np.array([index[n] for n in picks[:, 1]])
+    t = rng.random(n_points)
+    return (x[u] + t * (x[v] - x[u]) + rng.normal(0, spread, n_points),
+            y[u] + t * (y[v] - y[u]) + rng.normal(0, spread, n_points))
+
+
+# --- Measurement ---
+
+def measure(func, repeat=3):
+    """
+    Best and mean wall time over `repeat` runs, then the tracemalloc peak of one more run.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "mean_seconds": float(np.mean(times)), "peak_mb": peak / 2 ** 20}
+
+
+def _stage_cases(stage, size, seed, road_graph="grid"):
+    """
+    (params, zero-argument callable) for one stage at one size; setup happens here, untimed.
+    """
+    if stage in ("build_network", "compute_network_metrics", "simulate_trolling_spread", "prioritize_editors"):
+        from network_construction import build_network
+        df = synthetic_threads(size, seed=seed)
+        if stage == "build_network":
+            return {"rows": size}, lambda: build_network(df)
+        G = build_network(df)
+        params = {"rows": size, "nodes": G.number_of_nodes(), "edges": G.number_of_edges()}
+        if stage == "compute_network_metrics":
+            from network_metrics import compute_network_metrics
+            return params, lambda: compute_network_metrics(G, processes=1)
+        from epidemic_models import simulate_trolling_spread, prioritize_editors
+        random.seed(seed)
+        initial = random.sample(list(G.nodes), min(2, G.number_of_nodes()))
+        if stage == "simulate_trolling_spread":
+            return params, lambda: simulate_trolling_spread(G, initial)
+        spread = simulate_trolling_spread(G, initial)
+        return {**params, "trolls": len(spread)}, lambda: prioritize_editors(G, spread)
+
+    # Road stages: a street network with about size / 10 nodes, and `size` accident points
+    side = max(5, int(np.sqrt(size / 10)))
+    if road_graph == "planar":
+        G = planar_road_graph(side * side, extent=side * 100.0, seed=seed)
+    else:
+        G = grid_road_graph(side, side, seed=seed)
+    params = {"points": size, "nodes": G.number_of_nodes(), "edges": G.number_of_edges()}
+    if stage == "snapping":
+        from edge_snapping import EdgeIndex
+        x, y = synthetic_accidents(G, size, seed=seed)
+        return params, lambda: EdgeIndex(G).snap(x, y)
+    if stage == "find_circuit":
+        # The random-walk find_circuit was replaced by marathon_loops.LoopSearch, which
+        # Voronoi_diagrams.py runs per cell through find_loops; one search is timed here
+        from marathon_loops import LoopSearch
+        total = sum(d["length"] for _, _, d in G.edges(data=True)) / 2
+        target = min(42000.0, total / 4)
+        start = (side // 2) * side + side // 2
+        params = {**params, "target_length": target}
+        return params, lambda: LoopSearch(G).find(start, target_length=target, tolerance=target / 20,
+                                                  top_n=5, max_attempts=20, seed=seed)
+    raise ValueError(f"Unknown stage {stage!r}; expected one of {STAGES}")
+
+
+def run_benchmarks(stages=STAGES, sizes=(1000, 10000), repeat=3, seed=0, road_graph="grid"):
+    """
+    Runs every stage at every size; returns a JSON-serializable dict (metadata + one record
+    per stage and size).
+    """
+    records = []
+    for stage in stages:
+        for size in sizes:
+            params, func = _stage_cases(stage, size, seed, road_graph)
+            result = measure(func, repeat=repeat)
+            print(f"{stage:>26} size {size:>8}: {result['seconds']:.4f} s, peak {result['peak_mb']:.1f} MB")
+            records.append({"stage": stage, "size": size, "params": params, **result})
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "networkx": nx.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+            "road_graph": road_graph
+        },
+        "results": records
+    }
+
+
+def compare(previous, current):
+    """
+    Per (stage, size) speedup (previous / current time) and memory ratio of two result dicts.
+    """
+    before = {(r["stage"], r["size"]): r for r in previous["results"]}
+    rows = []
+    for r in current["results"]:
+        old = before.get((r["stage"], r["size"]))
+        if old is not None:
+            rows.append({"stage": r["stage"], "size": r["size"],
+                         "speedup": old["seconds"] / r["seconds"] if r["seconds"] > 0 else float("inf"),
+                         "memory_ratio": r["peak_mb"] / old["peak_mb"] if old["peak_mb"] > 0 else float("nan")})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every stage on synthetic data.")
+    parser.add_argument("--stages", nargs="*", default=list(STAGES), choices=STAGES)
+    parser.add_argument("--sizes", nargs="*", type=int, default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--road-graph", default="grid", choices=["grid", "planar"])
+    parser.add_argument("--output", default=None, help="JSON file (default: .cache/benchmarks/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.stages, args.sizes, repeat=args.repeat, seed=args.seed,
+                             road_graph=args.road_graph)
+    output = args.output or os.path.join(OUTPUT_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), results).to_string(index=False))
@@ -0,0 +1,81 @@
+# edge_snapping.py
+# Batched snapping of accident points onto the edges of a projected OSMnx graph.
+#
+# Section 5 of accident_analysis.py looked up every accident's nearest edge and then projected
+# the point onto that edge one geometry at a time. EdgeIndex builds an STRtree over all edge
+# geometries once, and snap() answers a whole array of points with shapely 2 vectorized
+# operations: nearest edge, offset along it, fraction of the edge to the closer intersection
+# and perpendicular distance. Points are processed in chunks so millions of accidents fit in
+# memory.
+
+import numpy as np
+import pandas as pd
+import shapely
+import osmnx as ox
+
+# Points snapped per vectorized batch
+CHUNK_SIZE = 500_000
+
+
+class EdgeIndex:
+    """
+    Spatial index over the edges of a projected graph (coordinates in metres).
+    """
+
+    def __init__(self, G_proj):
+        edges = ox.graph_to_gdfs(G_proj, nodes=False, fill_edge_geometry=True)
+        self.edge_keys = edges.index
+        self.geometries = np.asarray(edges.geometry.values)
+        self.lengths = shapely.length(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def snap(self, x, y, chunk_size=CHUNK_SIZE):
+        """
+        Snaps points (arrays of x and y in the graph CRS) to their nearest edges. Returns one row
+        per point with the edge (u, v, key), the offset along the edge geometry, the edge length,
+        the fraction min(offset, length - offset) / length and the distance to the edge.
+        Points without a nearest edge (NaN or empty coordinates) get matched=False and
+        missing values in every other column.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        edge_ids = np.full(len(x), -1, dtype=np.int64)
+        distances = np.full(len(x), np.nan)
+        offsets = np.full(len(x), np.nan)
+        for start in range(0, len(x), chunk_size):
+            stop = min(start + chunk_size, len(x))
+            points = shapely.points(x[start:stop], y[start:stop])
+            (point_ids, nearest), dist = self.tree.query_nearest(points, return_distance=True, all_matches=False)
+            edge_ids[start + point_ids] = nearest
+            distances[start + point_ids] = dist
+            offsets[start + point_ids] = shapely.line_locate_point(self.geometries[nearest], points[point_ids])
+
+        matched = edge_ids >= 0
+        lengths = np.full(len(x), np.nan)
+        lengths[matched] = self.lengths[edge_ids[matched]]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fractions = np.where(lengths > 0, np.minimum(offsets, lengths - offsets) / lengths, np.nan)
+        keys = self.edge_keys[edge_ids[matched]]
+        rows = np.flatnonzero(matched)
+        columns = {}
+        for level, name in enumerate(("u", "v", "key")):
+            # Nullable arrays keep integer node ids as integers next to the unmatched rows
+            values = pd.array(np.asarray(keys.get_level_values(level)))
+            columns[name] = pd.Series(values, index=rows).reindex(pd.RangeIndex(len(x)))
+        return pd.DataFrame({
+            **columns,
+            "offset": offsets,
+            "edge_length": lengths,
+            "fraction": fractions,
+            "distance": distances,
+            "matched": matched
+        })
+
+
+def snap_points(G_proj, x, y):
+    """
+    One-off convenience wrapper: builds an EdgeIndex for G_proj and snaps the points, keeping
+    only the matched rows (the index still gives each row's position in x and y).
+    """
+    snapped = EdgeIndex(G_proj).snap(x, y)
+    return snapped[snapped["matched"]]
@@ -0,0 +1,174 @@
+# editor_priority.py
+# Incremental triage queue for the moderation workflow.
+#
+# prioritize_editors ranks editors by how many identified trolls they are connected to, but
+# rebuilds and sorts the whole ranking on every call. EditorPrioritizer keeps the scores in an
+# indexed max-heap instead: confirming or clearing a troll touches only that editor's
+# neighbours, O(deg * log n), and top(k) walks the heap best-first in O(k log k). Ties are
+# broken by the order in which editors first received a score, as in the stable sort of the
+# one-shot ranking.
+
+import heapq
+import networkx as nx
+
+
+class IndexedMaxHeap:
+    """
+    Binary max-heap of keys ordered by score, with a position index so that the score of any
+    key can be changed or the key removed in O(log n). Equal scores rank the key inserted first
+    higher (a removed key keeps its place in that order if it returns).
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.scores = []          # (score, -insertion number) priorities, aligned with keys
+        self.position = {}
+        self.order = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.position
+
+    def _swap(self, i, j):
+        self.keys[i], self.keys[j] = self.keys[j], self.keys[i]
+        self.scores[i], self.scores[j] = self.scores[j], self.scores[i]
+        self.position[self.keys[i]] = i
+        self.position[self.keys[j]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self.scores[parent] >= self.scores[i]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        n = len(self.keys)
+        while True:
+            largest, left, right = i, 2 * i + 1, 2 * i + 2
+            if left < n and self.scores[left] > self.scores[largest]:
+                largest = left
+            if right < n and self.scores[right] > self.scores[largest]:
+                largest = right
+            if largest == i:
+                return
+            self._swap(i, largest)
+            i = largest
+
+    def set(self, key, score):
+        """
+        Inserts `key` or changes its score.
+        """
+        if key not in self.order:
+            self.order[key] = len(self.order)
+        score = (score, -self.order[key])
+        i = self.position.get(key)
+        if i is None:
+            self.keys.append(key)
+            self.scores.append(score)
+            self.position[key] = len(self.keys) - 1
+            self._sift_up(len(self.keys) - 1)
+            return
+        old = self.scores[i]
+        self.scores[i] = score
+        if score > old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, key):
+        i = self.position.pop(key, None)
+        if i is None:
+            return
+        last = len(self.keys) - 1
+        if i != last:
+            self.keys[i], self.scores[i] = self.keys[last], self.scores[last]
+            self.position[self.keys[i]] = i
+        self.keys.pop()
+        self.scores.pop()
+        if i < len(self.keys):
+            self._sift_up(i)
+            self._sift_down(self.position[self.keys[i]])
+
+    def top(self, k):
+        """
+        The k highest-scoring (key, score) pairs, found best-first without touching the rest.
+        """
+        result, frontier = [], [(-self.scores[0][0], -self.scores[0][1], 0)] if self.keys else []
+        while frontier and len(result) < k:
+            neg_score, _, i = heapq.heappop(frontier)
+            result.append((self.keys[i], -neg_score))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self.keys):
+                    score, neg_order = self.scores[child]
+                    heapq.heappush(frontier, (-score, -neg_order, child))
+        return result
+
+
+class EditorPrioritizer:
+    """
+    Stateful version of prioritize_editors: an editor's score is the number of identified trolls
+    among its neighbours (or the total edge weight to them, e.g. shared threads, with `weight`).
+    Trolls themselves are never ranked.
+    """
+
+    def __init__(self, G, identified_trolls=(), weight=None):
+        self.G = G
+        self.weight = weight
+        self.trolls = set()
+        self.scores = {}
+        self.heap = IndexedMaxHeap()
+        for troll in identified_trolls:
+            self.add_troll(troll)
+
+    def _neighbors(self, node):
+        if isinstance(self.G, nx.Graph):
+            if self.weight is None:
+                return [(v, 1) for v in self.G.neighbors(node)]
+            return [(v, d.get(self.weight, 1)) for v, d in self.G[node].items()]
+        if self.weight is None:
+            return [(v, 1) for v in self.G.neighbors(node)]
+        return self.G.neighbor_weights(node)
+
+    def _refresh(self, node):
+        score = self.scores.get(node, 0)
+        if node in self.trolls or score <= 1e-12:
+            self.heap.remove(node)
+        else:
+            self.heap.set(node, score)
+
+    def add_troll(self, troll):
+        """
+        Marks an editor as a confirmed troll and raises the scores of its neighbours.
+        """
+        if troll in self.trolls:
+            return
+        self.trolls.add(troll)
+        self.heap.remove(troll)
+        for neighbor, w in self._neighbors(troll):
+            self.scores[neighbor] = self.scores.get(neighbor, 0) + w
+            self._refresh(neighbor)
+
+    def clear_troll(self, troll):
+        """
+        Withdraws a troll identification; the editor re-enters the ranking with its own score.
+        """
+        if troll not in self.trolls:
+            return
+        self.trolls.discard(troll)
+        for neighbor, w in self._neighbors(troll):
+            self.scores[neighbor] = self.scores.get(neighbor, 0) - w
+            self._refresh(neighbor)
+        self._refresh(troll)
+
+    def score(self, editor):
+        return 0 if editor in self.trolls else self.scores.get(editor, 0)
+
+    def top(self, k=None):
+        """
+        The k editors to check first as (editor, score) pairs; k=None returns the full ranking.
+        """
+        return self.heap.top(len(self.heap) if k is None else k)
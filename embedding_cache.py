@@ -0,0 +1,163 @@
+# embedding_cache.py
+# On-disk checkpoints of trained knowledge-graph embeddings, streamed projections and an
+# approximate nearest-neighbour index.
+#
+# Task D retrained TransE on CoDExMedium (100 epochs) on every run and then loaded every
+# embedding to fit a PCA for one scatter plot. cached_embeddings stores the trained entity
+# embeddings as a .npy file next to the entity label table and the training settings, in a
+# directory keyed by a hash of dataset, model and hyperparameters; later runs memory-map the
+# array instead of training. project_2d fits an IncrementalPCA batch by batch over the
+# memory-mapped rows. IVFIndex is an inverted-file index (k-means coarse quantizer, only the
+# closest lists are scanned) for "entities similar to X" queries, saved beside the checkpoint.
+
+import hashlib
+import json
+import os
+import numpy as np
+
+CACHE_DIR = os.path.join(".cache", "embeddings")
+
+# Rows processed at once when streaming over the embeddings
+BATCH_ROWS = 10_000
+
+
+def embedding_key(dataset, model, **hyperparameters):
+    """
+    Short hash identifying one trained configuration.
+    """
+    spec = json.dumps({"dataset": dataset, "model": model, "hyperparameters": hyperparameters},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def _batches(n, batch_rows=BATCH_ROWS):
+    for start in range(0, n, batch_rows):
+        yield slice(start, min(start + batch_rows, n))
+
+
+class IVFIndex:
+    """
+    Inverted-file index over the rows of `vectors` (Euclidean distance). Rows are grouped by
+    their nearest of `n_lists` k-means centroids; a query scans the lists of its `n_probe`
+    nearest centroids only. Lists are stored CSR-style (order, offsets).
+    """
+
+    def __init__(self, centroids, order, offsets):
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, sample_size=50_000, seed=0):
+        from sklearn.cluster import MiniBatchKMeans
+        n = len(vectors)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=seed, n_init=3).fit(np.asarray(vectors[sample]))
+        assignment = np.concatenate([kmeans.predict(np.asarray(vectors[rows])) for rows in _batches(n)])
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+        return cls(kmeans.cluster_centers_.astype(np.float32), order, offsets)
+
+    def search(self, vectors, query, k=10, n_probe=8):
+        """
+        Positions and distances of (approximately) the k rows of `vectors` nearest to `query`.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        lists = np.argsort(((self.centroids - query) ** 2).sum(axis=1))[:n_probe]
+        candidates = np.sort(np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in lists]))
+        distances = np.sqrt(((np.asarray(vectors[candidates]) - query) ** 2).sum(axis=1))
+        best = np.argsort(distances)[:k]
+        return candidates[best], distances[best]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ("centroids", "order", "offsets"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path):
+        return cls(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                     for name in ("centroids", "order", "offsets")))
+
+
+class EmbeddingCheckpoint:
+    """
+    A saved embedding table: `embeddings` is memory-mapped (rows follow `labels`).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        with open(os.path.join(path, "labels.json"), encoding="utf-8") as f:
+            self.labels = json.load(f)
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.label_index = {label: i for i, label in enumerate(self.labels)}
+        self._index = None
+
+    @staticmethod
+    def save(path, embeddings, labels, meta):
+        if len(embeddings) != len(labels):
+            raise ValueError("Every embedding row needs a label")
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "embeddings.npy"), np.asarray(embeddings, dtype=np.float32))
+        with open(os.path.join(path, "labels.json"), "w", encoding="utf-8") as f:
+            json.dump(list(labels), f)
+        # meta.json is written last: its presence marks a complete checkpoint
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, sort_keys=True, default=str)
+
+    def index(self, n_lists=None):
+        """
+        The IVF index of this checkpoint, built and saved on first use.
+        """
+        if self._index is None:
+            index_path = os.path.join(self.path, "ivf")
+            if os.path.exists(os.path.join(index_path, "offsets.npy")):
+                self._index = IVFIndex.load(index_path)
+            else:
+                self._index = IVFIndex.build(self.embeddings, n_lists=n_lists)
+                self._index.save(index_path)
+        return self._index
+
+    def similar(self, label, k=10, n_probe=8):
+        """
+        The k entities nearest to `label` (excluding itself) as [(label, distance)].
+        """
+        position = self.label_index[label]
+        rows, distances = self.index().search(self.embeddings, self.embeddings[position], k=k + 1, n_probe=n_probe)
+        return [(self.labels[r], float(d)) for r, d in zip(rows, distances) if r != position][:k]
+
+
+def cached_embeddings(dataset, model, train, cache_dir=CACHE_DIR, **hyperparameters):
+    """
+    Loads the checkpoint for (dataset, model, hyperparameters), or calls `train()` once, which
+    must return (embedding array, entity labels in row order), and saves its output first.
+    """
+    path = os.path.join(cache_dir, f"{dataset}-{model}-{embedding_key(dataset, model, **hyperparameters)}")
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        embeddings, labels = train()
+        EmbeddingCheckpoint.save(path, embeddings, labels,
+                                 {"dataset": dataset, "model": model, "hyperparameters": hyperparameters})
+    return EmbeddingCheckpoint(path)
+
+
+def project_2d(embeddings, n_components=2, method="incremental", batch_rows=BATCH_ROWS, seed=0):
+    """
+    PCA projection of (possibly memory-mapped) embeddings. "incremental" streams the rows in
+    batches through IncrementalPCA; "randomized" uses a randomized SVD on the full array.
+    """
+    from sklearn.decomposition import PCA, IncrementalPCA
+    if method == "randomized":
+        return PCA(n_components=n_components, svd_solver="randomized", random_state=seed).fit_transform(np.asarray(embeddings))
+    if method != "incremental":
+        raise ValueError(f"Unknown method {method!r}; expected 'incremental' or 'randomized'")
+    batch_rows = max(batch_rows, n_components)
+    pca = IncrementalPCA(n_components=n_components)
+    for rows in _batches(len(embeddings), batch_rows):
+        # IncrementalPCA needs at least n_components rows per batch; a shorter tail is only projected
+        if rows.stop - rows.start >= n_components:
+            pca.partial_fit(np.asarray(embeddings[rows]))
+    return np.vstack([pca.transform(np.asarray(embeddings[rows])) for rows in _batches(len(embeddings), batch_rows)])
@@ -0,0 +1,149 @@
+# epidemic_engine.py
+# Batched Monte Carlo simulation of trolling spread on a CSR adjacency.
+#
+# simulate_trolling_spread in epidemic_models runs one SI trajectory with a Python loop over
+# every infected-neighbour pair. Here many independent trials run at once: the state is a
+# boolean (node x trial) matrix, and one sparse product per step gives, for every node and
+# trial, the number k of infected neighbours. A susceptible node is then infected with
+# probability 1 - (1 - beta)^k, which is exactly the chance that at least one of the k
+# independent per-neighbour attempts of the scalar model succeeds.
+#
+# Models: SI (no recovery), SIR (infected recover for good with probability gamma per step)
+# and SIS (infected become susceptible again with probability gamma per step).
+
+import numpy as np
+from path_length import adjacency_matrix
+
+MODELS = ("SI", "SIR", "SIS")
+
+# Node x trial cells simulated per block of trials
+MAX_BLOCK_CELLS = 50_000_000
+
+
+def initial_state(n, trials, node_ids, rng):
+    """
+    Boolean (n x trials) matrix of initially infected nodes. `node_ids` is either an array of
+    row indices shared by every trial, or an int k to draw k random seeds per trial.
+    """
+    state = np.zeros((n, trials), dtype=bool)
+    if np.isscalar(node_ids):
+        k = min(int(node_ids), n)
+        seeds = np.argsort(rng.random((n, trials)), axis=0)[:k] if k else np.empty((0, trials), dtype=int)
+        state[seeds, np.arange(trials)] = True
+    else:
+        state[np.asarray(node_ids, dtype=np.int64)] = True
+    return state
+
+
+def _run_block(A, infected, model, beta, gamma, steps, rng):
+    n, trials = infected.shape
+    recovered = np.zeros_like(infected)
+    ever = infected.copy()
+    curves = {key: np.zeros((steps + 1, trials), dtype=np.int64) for key in ("infected", "recovered", "ever_infected")}
+    curves["infected"][0] = curves["ever_infected"][0] = infected.sum(axis=0)
+    log_escape = np.log1p(-beta) if beta < 1 else -np.inf
+    for t in range(1, steps + 1):
+        # Infected neighbours per (node, trial); only susceptible cells under pressure draw randoms
+        pressure = A @ infected.astype(np.float32)
+        rows, cols = np.nonzero((pressure > 0) & ~infected & ~recovered)
+        p = -np.expm1(pressure[rows, cols] * log_escape)
+        hit = rng.random(len(rows)) < p
+        new_infected = np.zeros_like(infected)
+        new_infected[rows[hit], cols[hit]] = True
+
+        if model != "SI" and gamma > 0:
+            rows, cols = np.nonzero(infected)
+            heal = rng.random(len(rows)) < gamma
+            infected[rows[heal], cols[heal]] = False
+            if model == "SIR":
+                recovered[rows[heal], cols[heal]] = True
+        infected |= new_infected
+        ever |= new_infected
+
+        curves["infected"][t] = infected.sum(axis=0)
+        curves["recovered"][t] = recovered.sum(axis=0)
+        curves["ever_infected"][t] = ever.sum(axis=0)
+    return curves, ever
+
+
+def _check_parameters(trials, beta, gamma, model):
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {MODELS}")
+    if trials < 1:
+        raise ValueError(f"trials must be at least 1, got {trials}")
+    if not 0 <= beta <= 1:
+        raise ValueError(f"beta must be a probability in [0, 1], got {beta}")
+    if not 0 <= gamma <= 1:
+        raise ValueError(f"gamma must be a probability in [0, 1], got {gamma}")
+
+
+def simulate_spread_csr(A, initial_rows, trials=1000, steps=5, beta=0.5, gamma=0.0, model="SI", seed=None):
+    """
+    simulate_spread_batch on a prebuilt float32 CSR adjacency A, with initial_rows as row
+    indices (or an int k), for callers that run many simulations on the same graph.
+    Returns the curves and the `reached` matrix, without the node list.
+    """
+    _check_parameters(trials, beta, gamma, model)
+    n = A.shape[0]
+    rng = np.random.default_rng(seed)
+    block = max(1, MAX_BLOCK_CELLS // max(n, 1))
+    blocks, reached = [], []
+    for start in range(0, trials, block):
+        size = min(block, trials - start)
+        state = initial_state(n, size, initial_rows, rng)
+        curves, ever = _run_block(A, state, model, beta, gamma, steps, rng)
+        blocks.append(curves)
+        reached.append(ever)
+
+    result = {key: np.hstack([curves[key] for curves in blocks]) for key in blocks[0]}
+    result["reached"] = np.hstack(reached)
+    return result
+
+
+def reached_from_sources(A, sources, steps=5, beta=0.5, rng=None):
+    """
+    One SI run per entry of `sources` (row indices), each started from that node alone.
+    Returns the boolean (n x len(sources)) matrix of nodes ever infected in each run.
+    """
+    _check_parameters(1, beta, 0.0, "SI")
+    rng = rng if rng is not None else np.random.default_rng()
+    state = np.zeros((A.shape[0], len(sources)), dtype=bool)
+    state[np.asarray(sources, dtype=np.int64), np.arange(len(sources))] = True
+    _, ever = _run_block(A, state, "SI", beta, 0.0, steps, rng)
+    return ever
+
+
+def spread_adjacency(G):
+    """
+    (float32 CSR adjacency, node list) of G, as used by simulate_spread_csr.
+    """
+    A, nodes = adjacency_matrix(G)
+    return A.astype(np.float32), nodes
+
+
+def simulate_spread_batch(G, initial_trolls, trials=1000, steps=5, beta=0.5, gamma=0.0, model="SI", seed=None):
+    """
+    Runs `trials` independent epidemics on G (networkx graph or graph_store.CSRGraph).
+    initial_trolls is a list of node labels shared by all trials, or an int k for k random
+    seeds per trial. Returns per-step infected/recovered/ever-infected counts (steps+1 x trials)
+    and the (node x trial) matrix of nodes ever infected.
+    """
+    _check_parameters(trials, beta, gamma, model)
+    A, nodes = spread_adjacency(G)
+    if not np.isscalar(initial_trolls):
+        index = {node: i for i, node in enumerate(nodes)}
+        initial_trolls = [index[node] for node in initial_trolls]
+    result = simulate_spread_csr(A, initial_trolls, trials=trials, steps=steps, beta=beta, gamma=gamma,
+                                 model=model, seed=seed)
+    result["nodes"] = nodes
+    return result
+
+
+def curve_summary(curves, percentiles=(5, 50, 95)):
+    """
+    Mean and percentiles across trials of a (steps+1 x trials) curve array, one row per step.
+    """
+    summary = {"mean": curves.mean(axis=1)}
+    for q, values in zip(percentiles, np.percentile(curves, percentiles, axis=1)):
+        summary[f"p{q}"] = values
+    return summary
@@ -1,27 +1,30 @@
 import networkx as nx
-import pickle
+import os
 import random
+from graph_store import load_graph, convert_pickle
+from epidemic_engine import simulate_spread_batch, curve_summary
+from influence_maximization import select_seeds
+from editor_priority import EditorPrioritizer
 
-# Load networks from pickle files
-with open("admin_graph.pkl", "rb") as f:
-    admin_graph = pickle.load(f)
-with open("bot_graph.pkl", "rb") as f:
-    bot_graph = pickle.load(f)
-with open("deletion_graph.pkl", "rb") as f:
-    deletion_graph = pickle.load(f)
+# Load networks from the memory-mapped CSR store, converting legacy pickles on first use
+def load_network(store_path, pkl_path):
+    if not os.path.exists(store_path) and os.path.exists(pkl_path):
+        convert_pickle(pkl_path, store_path)
+    return load_graph(store_path)
 
-# Organize graphs into a dictionary
-networks = {
-    "ADMINISTRATORS": admin_graph,
-    "BOT_REQUESTS": bot_graph,
-    "REQUEST_FOR_DELETION": deletion_graph
-}
+def load_networks():
+    return {
+        "ADMINISTRATORS": load_network("admin_graph.csr", "admin_graph.pkl"),
+        "BOT_REQUESTS": load_network("bot_graph.csr", "bot_graph.pkl"),
+        "REQUEST_FOR_DELETION": load_network("deletion_graph.csr", "deletion_graph.pkl")
+    }
 
 # Function to simulate trolling spread using SI model
-def simulate_trolling_spread(G, initial_trolls, steps=5):
+def simulate_trolling_spread(G, initial_trolls, steps=5, beta=0.5):
     """
     Simulates the spread of controversial discussions (trolling) in the network using an SI model.
-    Infected nodes try to infect their neighbors at each step with a fixed probability.
+    Infected nodes try to infect their neighbors at each step with probability beta.
+    For many runs at once (and SIR/SIS variants) use epidemic_engine.simulate_spread_batch.
     """
     infected = set(initial_trolls)
     for _ in range(steps):
@@ -29,7 +32,7 @@ def simulate_trolling_spread(G, initial_trolls, steps=5):
         for troll in infected:
             neighbors = list(G.neighbors(troll))
             for neighbor in neighbors:
-                if neighbor not in infected and random.random() < 0.5:  # 50% infection probability
+                if neighbor not in infected and random.random() < beta:
                     new_infected.add(neighbor)
         infected.update(new_infected)
     return infected
@@ -39,31 +42,50 @@ def prioritize_editors(G, identified_trolls):
     """
     Returns a priority list of editors to check based on their proximity to already infected editors.
     Editors with more connections to known trolls are ranked higher.
+    When trolls are confirmed one at a time, keep an EditorPrioritizer and update it instead.
     """
-    priority_list = {}
-    for troll in identified_trolls:
-        for neighbor in G.neighbors(troll):
-            if neighbor not in identified_trolls:
-                priority_list[neighbor] = priority_list.get(neighbor, 0) + 1
-    return sorted(priority_list.items(), key=lambda x: x[1], reverse=True)
+    return EditorPrioritizer(G, identified_trolls).top()
 
-# Set seed for reproducibility
-random.seed(42)
+# Run the simulation for each network
+def run_trolling_analysis(networks, seed=42):
+    # Set seed for reproducibility
+    random.seed(seed)
+    results = {}
+    for name, G in networks.items():
+        if len(G.nodes) == 0:
+            print(f"{name}: Graph is empty, skipping.")
+            continue
 
-# Run simulation for each network
-for name, G in networks.items():
-    if len(G.nodes) == 0:
-        print(f"{name}: Graph is empty, skipping.")
-        continue
+        initial_trolls = random.sample(list(G.nodes), min(2, len(G.nodes)))
+        spread = simulate_trolling_spread(G, initial_trolls)
+        priority = prioritize_editors(G, spread)
+        batch = simulate_spread_batch(G, initial_trolls, trials=1000, steps=5, beta=0.5, seed=seed)
+        final = curve_summary(batch["ever_infected"])
+        spreaders = select_seeds(G, 5, steps=5, beta=0.5, seed=seed)
 
-    initial_trolls = random.sample(list(G.nodes), min(2, len(G.nodes)))
-    spread = simulate_trolling_spread(G, initial_trolls)
-    priority = prioritize_editors(G, spread)
+        print(f"\n--- {name} ---")
+        print(f"Initial trolls: {initial_trolls}")
+        print(f"Spread after 5 steps: {len(spread)} users infected.")
+        print(f"Over 1000 runs: mean {final['mean'][-1]:.1f} infected (5-95%: {final['p5'][-1]:.0f}-{final['p95'][-1]:.0f}).")
+        print("Top 10 editors to check (priority list):")
+        for editor, score in priority[:10]:
+            print(f"  {editor}: score {score}")
 
-    print(f"\n--- {name} ---")
-    print(f"Initial trolls: {initial_trolls}")
-    print(f"Spread after 5 steps: {len(spread)} users infected.")
-    print("Top 10 editors to check (priority list):")
-    for editor, score in priority[:10]:
-        print(f"  {editor}: score {score}")
+        # Reverse question: which editors would spread trolling the furthest if they turned?
+        print("Top 5 potential super-spreaders (RR-set greedy):")
+        for editor, expected in spreaders:
+            print(f"  {editor}: expected reach {expected:.1f}")
+
+        results[name] = {
+            "initial_trolls": initial_trolls,
+            "spread": len(spread),
+            "priority": priority[:10],
+            "ever_infected": final,
+            "super_spreaders": spreaders
+        }
+    return results
+
+
+if __name__ == "__main__":
+    run_trolling_analysis(load_networks())
 
@@ -0,0 +1,255 @@
+# graph_store.py
+# Compact on-disk CSR storage for the editor networks.
+#
+# A stored graph is a directory holding plain .npy arrays:
+#   node table   - index -> node label, in one of three forms: string labels (usernames) as
+#                  one UTF-8 blob, node_text.npy (uint8), cut by node_offsets.npy (int64);
+#                  integer labels as nodes.npy (int64); any other labels pickled in nodes.pkl
+#   indptr.npy   - CSR row pointers (int64)
+#   indices.npy  - CSR column indices (int32)
+#   weights.npy  - optional edge weights, aligned with indices
+# The CSR arrays are memory-mapped when loaded, so opening a graph costs little more than
+# decoding the node table, and only the rows that are actually visited are paged in.
+
+import os
+import pickle
+import numpy as np
+import scipy.sparse as sp
+import networkx as nx
+
+NODE_FILES = ("node_text.npy", "node_offsets.npy", "nodes.npy", "nodes.pkl")
+
+
+def _save_nodes(nodes, path):
+    """
+    Writes the node table without padding labels to a common width, keeping their types.
+    """
+    for name in NODE_FILES:
+        if os.path.exists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+    if all(isinstance(n, str) for n in nodes):
+        encoded = [n.encode("utf-8") for n in nodes]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        np.save(os.path.join(path, "node_text.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        np.save(os.path.join(path, "node_offsets.npy"), offsets)
+    elif all(isinstance(n, (int, np.integer)) and not isinstance(n, bool) for n in nodes):
+        np.save(os.path.join(path, "nodes.npy"), np.array(nodes, dtype=np.int64))
+    else:
+        with open(os.path.join(path, "nodes.pkl"), "wb") as f:
+            pickle.dump(list(nodes), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_nodes(path):
+    """
+    Node table written by _save_nodes as an object array of the original labels (stores with
+    a fixed-width string nodes.npy, from before the blob format, still load).
+    """
+    offsets_path = os.path.join(path, "node_offsets.npy")
+    pickle_path = os.path.join(path, "nodes.pkl")
+    if os.path.exists(offsets_path):
+        text = np.load(os.path.join(path, "node_text.npy")).tobytes()
+        offsets = np.load(offsets_path).tolist()
+        labels = [text[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+    elif os.path.exists(pickle_path):
+        with open(pickle_path, "rb") as f:
+            labels = pickle.load(f)
+    else:
+        labels = np.load(os.path.join(path, "nodes.npy")).tolist()
+    nodes = np.empty(len(labels), dtype=object)
+    nodes[:] = labels
+    return nodes
+
+
+def save_graph(G, path, weight="weight"):
+    """
+    Writes an undirected networkx graph to `path` in CSR form.
+    Edge weights are stored only if at least one edge carries the `weight` attribute.
+    """
+    nodes = list(G.nodes)
+    has_weights = weight is not None and any(weight in d for _, _, d in G.edges(data=True))
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight if has_weights else None, format="csr")
+    A.sort_indices()
+
+    os.makedirs(path, exist_ok=True)
+    _save_nodes(nodes, path)
+    np.save(os.path.join(path, "indptr.npy"), A.indptr.astype(np.int64))
+    np.save(os.path.join(path, "indices.npy"), A.indices.astype(np.int32))
+    weights_path = os.path.join(path, "weights.npy")
+    if has_weights:
+        np.save(weights_path, A.data.astype(np.float64))
+    elif os.path.exists(weights_path):
+        os.remove(weights_path)
+
+
+def load_graph(path):
+    """
+    Opens a graph written by save_graph as a memory-mapped CSRGraph.
+    """
+    weights_path = os.path.join(path, "weights.npy")
+    return CSRGraph(
+        _load_nodes(path),
+        np.load(os.path.join(path, "indptr.npy"), mmap_mode="r"),
+        np.load(os.path.join(path, "indices.npy"), mmap_mode="r"),
+        np.load(weights_path, mmap_mode="r") if os.path.exists(weights_path) else None,
+    )
+
+
+def convert_pickle(pkl_path, path=None):
+    """
+    Converts one of the legacy pickled nx.Graph files (e.g. admin_graph.pkl) to the CSR store.
+    By default the store is written next to the pickle with a .csr suffix.
+    """
+    if path is None:
+        path = os.path.splitext(pkl_path)[0] + ".csr"
+    with open(pkl_path, "rb") as f:
+        G = pickle.load(f)
+    save_graph(G, path)
+    return path
+
+
+class CSRGraph:
+    """
+    Read-only undirected graph backed by CSR arrays, exposing the subset of the networkx API
+    used by epidemic_models, network_metrics and null_models (nodes, edges, neighbors, degree,
+    number_of_nodes/edges, is_directed).
+    """
+
+    def __init__(self, nodes, indptr, indices, weights=None):
+        self.node_ids = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._index = None
+
+    @classmethod
+    def from_networkx(cls, G, weight="weight"):
+        """
+        Builds an in-memory CSRGraph from a networkx graph.
+        """
+        nodes = list(G.nodes)
+        has_weights = weight is not None and any(weight in d for _, _, d in G.edges(data=True))
+        A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight if has_weights else None, format="csr")
+        A.sort_indices()
+        node_ids = np.empty(len(nodes), dtype=object)
+        node_ids[:] = nodes
+        return cls(node_ids, A.indptr, A.indices, A.data.astype(np.float64) if has_weights else None)
+
+    # --- Node-ID table ---
+
+    @property
+    def index(self):
+        """
+        Lazily built mapping from node label to row number.
+        """
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.node_ids.tolist())}
+        return self._index
+
+    def node_index(self, node):
+        return self.index[node]
+
+    @property
+    def nodes(self):
+        return self.node_ids.tolist()
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def __iter__(self):
+        return iter(self.node_ids.tolist())
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def number_of_nodes(self):
+        return len(self.node_ids)
+
+    def number_of_edges(self):
+        # Undirected graph: every edge is stored in both rows, self-loops only once
+        n_loops = int(np.count_nonzero(self.indices == np.repeat(np.arange(len(self.node_ids)), np.diff(self.indptr))))
+        return (len(self.indices) - n_loops) // 2 + n_loops
+
+    def is_directed(self):
+        return False
+
+    # --- Adjacency ---
+
+    def edges(self, data=False, default=1.0):
+        """
+        Every undirected edge once as (u, v), or (u, v, {"weight": w}) with data=True.
+        """
+        rows = np.repeat(np.arange(len(self.node_ids)), np.diff(self.indptr))
+        upper = rows <= np.asarray(self.indices)
+        u = self.node_ids[rows[upper]].tolist()
+        v = self.node_ids[np.asarray(self.indices)[upper]].tolist()
+        if not data:
+            return list(zip(u, v))
+        weights = np.asarray(self.weights)[upper].tolist() if self.weights is not None else [default] * len(u)
+        return [(a, b, {"weight": w}) for a, b, w in zip(u, v, weights)]
+
+    def neighbors(self, node):
+        i = self.index[node]
+        row = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        return iter(self.node_ids[row].tolist())
+
+    def neighbor_weights(self, node, default=1.0):
+        """
+        (neighbour, edge weight) pairs of a node; unweighted stores give `default` for every edge.
+        """
+        i = self.index[node]
+        start, end = self.indptr[i], self.indptr[i + 1]
+        labels = self.node_ids[self.indices[start:end]].tolist()
+        if self.weights is None:
+            return [(v, default) for v in labels]
+        return list(zip(labels, np.asarray(self.weights[start:end]).tolist()))
+
+    def has_edge(self, u, v):
+        i, j = self.index[u], self.index[v]
+        row = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        k = np.searchsorted(row, j)
+        return k < len(row) and row[k] == j
+
+    def edge_weight(self, u, v, default=1.0):
+        i, j = self.index[u], self.index[v]
+        start = self.indptr[i]
+        row = self.indices[start:self.indptr[i + 1]]
+        k = np.searchsorted(row, j)
+        if k == len(row) or row[k] != j:
+            raise KeyError((u, v))
+        return float(self.weights[start + k]) if self.weights is not None else default
+
+    def degree(self, nbunch=None, weight=None):
+        """
+        Mirrors nx.Graph.degree: a single node gives an int, otherwise (node, degree) pairs.
+        """
+        if weight is not None and self.weights is not None:
+            deg = np.asarray(self.to_scipy().sum(axis=1)).ravel()
+        else:
+            deg = np.diff(self.indptr)
+        if nbunch is not None and not isinstance(nbunch, (list, tuple, set)):
+            return deg[self.index[nbunch]].item()
+        if nbunch is None:
+            return zip(self.node_ids.tolist(), deg.tolist())
+        return [(n, deg[self.index[n]].item()) for n in nbunch]
+
+    # --- Conversion ---
+
+    def to_scipy(self):
+        """
+        Returns the adjacency as a scipy CSR matrix sharing the underlying arrays.
+        """
+        n = len(self.node_ids)
+        data = self.weights if self.weights is not None else np.ones(len(self.indices), dtype=np.float64)
+        return sp.csr_matrix((data, self.indices, self.indptr), shape=(n, n))
+
+    def to_networkx(self):
+        A = self.to_scipy().tocoo()
+        G = nx.Graph()
+        G.add_nodes_from(self.node_ids.tolist())
+        labels = self.node_ids
+        if self.weights is not None:
+            G.add_weighted_edges_from(zip(labels[A.row].tolist(), labels[A.col].tolist(), A.data.tolist()))
+        else:
+            G.add_edges_from(zip(labels[A.row].tolist(), labels[A.col].tolist()))
+        return G
@@ -0,0 +1,148 @@
+# incremental_network.py
+# Append-only ingestion of the Wikidata discussion CSVs, one archive month at a time.
+#
+# page_name values such as WikidataAdministratorsnoticeboardArchive201212.json encode the
+# archive month. Instead of rebuilding the whole co-participation graph with build_network,
+# IncrementalNetwork reads the CSVs in chunks, applies only the rows it has not seen before,
+# and records what each month contributed as a delta (edge-weight increments), so monthly
+# snapshots can be replayed without keeping a full copy of the graph per month.
+
+import pickle
+import re
+from collections import Counter
+import pandas as pd
+import networkx as nx
+
+ARCHIVE_MONTH = re.compile(r"Archive(\d{4})(\d{2})")
+
+# Pages without an archive month (the live noticeboard) are filed under this key
+CURRENT = "current"
+
+
+def archive_month(page_name):
+    """
+    Returns the archive month of a page as "YYYY-MM", or CURRENT for non-archived pages.
+    """
+    match = ARCHIVE_MONTH.search(page_name)
+    return f"{match.group(1)}-{match.group(2)}" if match else CURRENT
+
+
+def _edge_key(u, v):
+    return (u, v) if u <= v else (v, u)
+
+
+class IncrementalNetwork:
+    """
+    Co-participation graph (same topology and weights as build_network) that grows as new
+    threads and posts arrive. Keeps the participants of every thread seen so far, the live
+    graph, its cached stats and one delta per archive month.
+    """
+
+    def __init__(self):
+        self.graph = nx.Graph()
+        self.threads = {}   # (page_name, thread_subject) -> set of usernames
+        self.deltas = {}    # month -> Counter of edge-weight increments
+        self.stats = {"num_nodes": 0, "num_edges": 0, "density": 0.0}
+
+    # --- Ingestion ---
+
+    def ingest_csv(self, path, chunksize=50000):
+        """
+        Streams a thread_subject/username/page_name CSV in chunks and applies it.
+        Returns the set of months that received new edges.
+        """
+        touched = set()
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            touched |= self.ingest_frame(chunk)
+        return touched
+
+    def ingest_frame(self, df):
+        """
+        Applies the rows of a DataFrame that are not already part of the network.
+        Editors joining a known thread are linked to its earlier participants only.
+        """
+        df = df.dropna(subset=["page_name", "thread_subject", "username"])
+        touched = set()
+        for (page_name, subject), users in df.groupby(["page_name", "thread_subject"], sort=False)["username"]:
+            participants = self.threads.setdefault((page_name, subject), set())
+            new_users = [u for u in users.unique() if u not in participants]
+            if not new_users:
+                continue
+            month = archive_month(page_name)
+            delta = self.deltas.setdefault(month, Counter())
+            for user in new_users:
+                for other in participants:
+                    self._add_edge(user, other)
+                    delta[_edge_key(user, other)] += 1
+                participants.add(user)
+            touched.add(month)
+        return touched
+
+    def _add_edge(self, u, v):
+        G = self.graph
+        if G.has_edge(u, v):
+            G[u][v]["weight"] += 1
+            return
+        for node in (u, v):
+            if node not in G:
+                self.stats["num_nodes"] += 1
+        G.add_edge(u, v, weight=1)
+        self.stats["num_edges"] += 1
+        n = self.stats["num_nodes"]
+        self.stats["density"] = 2 * self.stats["num_edges"] / (n * (n - 1)) if n > 1 else 0.0
+
+    # --- Snapshots ---
+
+    def months(self):
+        """
+        Archive months in chronological order (CURRENT last).
+        """
+        return sorted(self.deltas, key=lambda m: (m == CURRENT, m))
+
+    def snapshot(self, month=None):
+        """
+        Rebuilds the network as of the end of `month` (inclusive) by replaying the deltas.
+        month=None replays everything, which equals the live graph.
+        """
+        G = nx.Graph()
+        for m in self.months():
+            if month is not None and m != month and (m == CURRENT or m > month):
+                continue
+            for (u, v), w in self.deltas[m].items():
+                if G.has_edge(u, v):
+                    G[u][v]["weight"] += w
+                else:
+                    G.add_edge(u, v, weight=w)
+        return G
+
+    def monthly_stats(self):
+        """
+        Cumulative nodes/edges/density after each month, computed in one pass over the deltas.
+        """
+        nodes, edges, rows = set(), set(), []
+        for m in self.months():
+            new_edges = self.deltas[m].keys() - edges
+            edges |= new_edges
+            for u, v in new_edges:
+                nodes.add(u)
+                nodes.add(v)
+            n, e = len(nodes), len(edges)
+            rows.append({
+                "month": m,
+                "new_edges": len(new_edges),
+                "num_nodes": n,
+                "num_edges": e,
+                "density": 2 * e / (n * (n - 1)) if n > 1 else 0.0
+            })
+        return pd.DataFrame(rows)
+
+    # --- Persistence ---
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -0,0 +1,138 @@
+# influence_maximization.py
+# Seed selection for troll containment: which k editors would spread trolling the furthest?
+#
+# Both methods keep the SI semantics of epidemic_models.simulate_trolling_spread (each step an
+# infected editor infects each susceptible neighbour with probability beta, for `steps` steps).
+#
+# "rr"   - reverse-reachable (RR) set sampling. Under the SI model the step at which an edge
+#          first transmits, counted from when its tail is infected, is Geometric(beta) and
+#          independent across edges, so an editor is infected within `steps` exactly when some
+#          seed is within `steps` of it in the graph with those random edge delays. An RR set
+#          is every editor within that delay distance of a random target; by the same argument
+#          it is distributed as the nodes reached by an SI run from the target on the reversed
+#          graph, so RR sets are drawn in batches as columns of one batched SI simulation
+#          (epidemic_engine). The expected spread of a seed set S is n * P(S hits a random RR
+#          set), and greedy max-coverage over the samples picks seeds with the usual (1 - 1/e)
+#          guarantee. The sample count follows from the accuracy wanted (rr_sample_size), and
+#          sampling stops early once the stored sets would exceed a memory budget.
+# "celf" - CELF lazy-greedy on batched Monte Carlo spread estimates (epidemic_engine).
+
+import heapq
+import numpy as np
+from epidemic_engine import reached_from_sources, simulate_spread_csr, spread_adjacency
+
+# RR sets (SI runs) sampled per batch
+RR_BATCH = 512
+
+# Bytes held per RR-set member: node id and set id (int32 each) plus, during each greedy step,
+# the uncovered-member mask (bool) and the gathered node ids (int32)
+RR_MEMBER_BYTES = 13
+
+
+def rr_sample_size(n, k, epsilon=0.05, delta=0.05):
+    """
+    RR sets needed so that, with probability 1 - delta, the coverage fraction of every seed set
+    the greedy search evaluates (at most k * n of them) is within epsilon of its expectation,
+    i.e. every spread estimate is within epsilon * n editors (Hoeffding plus a union bound).
+    """
+    return int(np.ceil((np.log(2 / delta) + np.log(max(k * n, 1))) / (2 * epsilon ** 2)))
+
+
+def sample_rr_sets(G, n_samples=None, k=1, steps=5, beta=0.5, epsilon=0.05, delta=0.05, memory_budget_mb=256,
+                   seed=None):
+    """
+    Draws `n_samples` RR sets (default: rr_sample_size(n, k, epsilon, delta)), stopping early
+    once they would take more than the memory budget. Returns (members, owners, n_sets, nodes):
+    the node positions in all sets and, aligned with them, the set each belongs to.
+    """
+    A, nodes = spread_adjacency(G)
+    A_rev = A.T.tocsr()
+    n = len(nodes)
+    if n_samples is None:
+        n_samples = rr_sample_size(n, k, epsilon, delta)
+    rng = np.random.default_rng(seed)
+    budget = memory_budget_mb * 1024 * 1024 // RR_MEMBER_BYTES
+    members, owners, n_sets, used = [], [], 0, 0
+    for start in range(0, n_samples, RR_BATCH):
+        targets = rng.integers(0, n, size=min(RR_BATCH, n_samples - start))
+        # Column j holds the RR set of targets[j]; nonzero on the transpose lists it set by set
+        sets, nodes_in = np.nonzero(reached_from_sources(A_rev, targets, steps, beta, rng).T)
+        sizes = np.bincount(sets, minlength=len(targets))
+        fits = int(np.searchsorted(np.cumsum(sizes), budget - used, side="right"))
+        keep = sets < fits
+        members.append(nodes_in[keep].astype(np.int32))
+        owners.append((sets[keep] + n_sets).astype(np.int32))
+        n_sets += fits
+        used += int(keep.sum())
+        if fits < len(targets):
+            break
+    if not members:
+        return np.empty(0, np.int32), np.empty(0, np.int32), 0, nodes
+    return np.concatenate(members), np.concatenate(owners), n_sets, nodes
+
+
+def _select_rr(G, k, steps, beta, n_samples, epsilon, delta, memory_budget_mb, seed):
+    members, owners, n_sets, nodes = sample_rr_sets(G, n_samples, k, steps, beta, epsilon, delta,
+                                                    memory_budget_mb, seed)
+    n = len(nodes)
+    if n_sets == 0:
+        return []
+    covered = np.zeros(n_sets, dtype=bool)
+    selected, hits = [], 0
+    while len(selected) < k:
+        # Gains of every editor at once: its uncovered RR sets (ties go to the first editor)
+        open_members = ~covered[owners]
+        gains = np.bincount(members[open_members], minlength=n)
+        v = int(np.argmax(gains))
+        if gains[v] == 0:
+            break
+        covered[owners[open_members & (members == v)]] = True
+        hits += int(gains[v])
+        selected.append((nodes[v], n * hits / n_sets))
+    return selected
+
+
+def _select_celf(G, k, steps, beta, trials, candidates, seed):
+    # One adjacency for every spread estimate; seeds are passed as row indices
+    A, nodes = spread_adjacency(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    if candidates is None:
+        candidates = list(nodes)
+
+    def spread(seeds):
+        if not seeds:
+            return 0.0
+        runs = simulate_spread_csr(A, [index[v] for v in seeds], trials=trials, steps=steps, beta=beta, seed=seed)
+        return float(runs["ever_infected"][-1].mean())
+
+    heap = [(-spread([v]), i, v) for i, v in enumerate(candidates)]
+    heapq.heapify(heap)
+    selected, seeds, current = [], [], 0.0
+    while heap and len(selected) < k:
+        neg_gain, i, v = heapq.heappop(heap)
+        total = spread(seeds + [v])
+        gain = total - current
+        # Lazy greedy: accept if the refreshed gain still beats the next stale upper bound
+        if not heap or gain >= -heap[0][0]:
+            seeds.append(v)
+            current = total
+            selected.append((v, total))
+        else:
+            heapq.heappush(heap, (-gain, i, v))
+    return selected
+
+
+def select_seeds(G, k, method="rr", steps=5, beta=0.5, n_samples=None, epsilon=0.05, delta=0.05,
+                 memory_budget_mb=256, trials=200, candidates=None, seed=None):
+    """
+    Returns the k editors whose joint infection spreads furthest under the SI model, as a list
+    of (editor, estimated number of editors infected after adding it) in selection order.
+    method="rr" uses RR-set sampling (n_samples, or enough for estimates within epsilon * n
+    with probability 1 - delta; memory_budget_mb); method="celf" uses lazy-greedy Monte Carlo
+    with `trials` runs per estimate, optionally over `candidates` only.
+    """
+    if method == "rr":
+        return _select_rr(G, k, steps, beta, n_samples, epsilon, delta, memory_budget_mb, seed)
+    if method == "celf":
+        return _select_celf(G, k, steps, beta, trials, candidates, seed)
+    raise ValueError(f"Unknown method {method!r}, expected 'rr' or 'celf'")
@@ -0,0 +1,262 @@
+# marathon_loops.py
+# Targeted search for marathon-length loops on an OSMnx road graph.
+#
+# The old find_circuit ran 100 unguided random walks and only kept a walk that happened to
+# step back onto its start node within +-2 km of 42 km. Here the shortest-path distance from
+# every node back to the start is computed once (a single Dijkstra, since the graph is
+# treated as undirected). A partial route of length L ending at node x can be closed by the
+# shortest path back, giving a loop of L + dist_back[x]; this potential never decreases as
+# the route grows, so a randomized depth-first search can:
+#   - prune every branch whose potential exceeds target + tolerance,
+#   - record a closed loop whenever the potential falls inside the tolerance window,
+#   - stop extending a route once its potential passes the target (it can only get worse).
+# Routes can be confined to a polygon (e.g. a Voronoi cell), loops are ranked by length
+# error and a road-quality score, and several start nodes run in parallel under a time budget.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import shapely
+from scipy.sparse import csgraph
+
+# Suitability of each OSM highway type for running, in [0, 1]
+HIGHWAY_QUALITY = {
+    "pedestrian": 1.0,
+    "footway": 1.0,
+    "path": 0.9,
+    "cycleway": 0.9,
+    "living_street": 0.9,
+    "track": 0.8,
+    "residential": 0.8,
+    "unclassified": 0.7,
+    "tertiary": 0.6,
+    "tertiary_link": 0.6,
+    "service": 0.6,
+    "secondary": 0.4,
+    "secondary_link": 0.4,
+    "primary": 0.3,
+    "primary_link": 0.3,
+    "trunk": 0.1,
+    "trunk_link": 0.1,
+    "steps": 0.0
+}
+DEFAULT_QUALITY = 0.5
+
+# Node expansions allowed per search attempt, as a multiple of the edges a loop needs
+EXPANSIONS_PER_EDGE = 20
+
+_worker_state = None
+
+
+def edge_quality(data, quality=HIGHWAY_QUALITY):
+    """
+    Quality of one edge from its highway tag (OSMnx stores a list when ways were merged).
+    """
+    highway = data.get("highway")
+    tags = highway if isinstance(highway, list) else [highway]
+    return float(np.mean([quality.get(tag, DEFAULT_QUALITY) for tag in tags]))
+
+
+class LoopSearch:
+    """
+    Undirected CSR view of an OSMnx graph (shortest parallel edge per node pair) with the
+    node coordinates and per-edge quality needed by the loop search. Picklable, so one
+    instance can be shipped to worker processes.
+    """
+
+    def __init__(self, G, weight="length", quality=HIGHWAY_QUALITY):
+        self.nodes = list(G.nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.x = np.array([G.nodes[node]["x"] for node in self.nodes], dtype=float)
+        self.y = np.array([G.nodes[node]["y"] for node in self.nodes], dtype=float)
+
+        edges = pd.DataFrame(
+            [(self.index[u], self.index[v], d[weight], edge_quality(d, quality)) for u, v, d in G.edges(data=True)],
+            columns=["u", "v", "length", "quality"]
+        )
+        a, b = np.minimum(edges["u"], edges["v"]), np.maximum(edges["u"], edges["v"])
+        edges = edges.assign(u=a, v=b).query("u != v").sort_values("length")
+        segments = edges.drop_duplicates(["u", "v"], keep="first")
+
+        n = len(self.nodes)
+        rows = np.concatenate([segments["u"], segments["v"]])
+        cols = np.concatenate([segments["v"], segments["u"]])
+        self.lengths = sp.csr_matrix((np.concatenate([segments["length"]] * 2), (rows, cols)), shape=(n, n))
+        self.quality = sp.csr_matrix((np.concatenate([segments["quality"]] * 2), (rows, cols)), shape=(n, n))
+        # Same sparsity pattern and order in both matrices
+        self.lengths.sort_indices()
+        self.quality.sort_indices()
+
+    def allowed_nodes(self, polygon=None, nodes=None):
+        """
+        Boolean mask of the nodes a route may use: those inside `polygon` (graph CRS) and
+        among `nodes` (e.g. a network Voronoi cell), or all.
+        """
+        allowed = np.ones(len(self.nodes), dtype=bool)
+        if polygon is not None:
+            allowed &= shapely.contains_xy(polygon, self.x, self.y)
+        if nodes is not None:
+            within = np.zeros(len(self.nodes), dtype=bool)
+            within[[self.index[node] for node in nodes]] = True
+            allowed &= within
+        return allowed
+
+    def distances_back(self, start, allowed, cutoff):
+        """
+        Shortest-path distance and predecessor of every node towards `start`, using only
+        allowed nodes; nodes further than `cutoff` are left at infinity.
+        """
+        keep = sp.diags(allowed.astype(float))
+        A = keep @ self.lengths @ keep
+        dist, pred = csgraph.dijkstra(A, directed=False, indices=start, limit=cutoff, return_predecessors=True)
+        return dist, pred
+
+    def _close(self, route, dist, pred, outbound_edges):
+        """
+        Closes a route with the shortest path back to its start. Returns the full node list,
+        its length and the length of return edges that repeat outbound edges.
+        """
+        back, overlap = [], 0.0
+        node = route[-1]
+        while pred[node] >= 0:
+            prev = pred[node]
+            if (min(node, prev), max(node, prev)) in outbound_edges:
+                overlap += self.lengths[node, prev]
+            back.append(prev)
+            node = prev
+        return route + back, overlap
+
+    def _loop_quality(self, loop):
+        a, b = np.asarray(loop[:-1]), np.asarray(loop[1:])
+        lengths = np.asarray(self.lengths[a, b]).ravel()
+        quality = np.asarray(self.quality[a, b]).ravel()
+        return float(lengths @ quality / lengths.sum())
+
+    def find(self, start, target_length=42000, tolerance=2000, top_n=5, polygon=None, nodes=None, max_attempts=1000,
+             time_budget=None, max_overlap=0.1, quality_weight=1.0, seed=None):
+        """
+        Up to `top_n` distinct loops from node id `start`, with lengths within `tolerance` of
+        `target_length` (metres), best first, using only nodes allowed by `polygon` and `nodes`
+        (see allowed_nodes). Each loop is a dict with the node path, length,
+        length error, quality (length-weighted mean edge quality) and overlap (share of the
+        length the return leg spends on outbound edges, at most `max_overlap`).
+        Loops are ranked by error / tolerance + quality_weight * (1 - quality).
+        """
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+        rng = np.random.default_rng(seed)
+        s = self.index[start]
+        allowed = self.allowed_nodes(polygon, nodes)
+        allowed[s] = True
+        upper = target_length + tolerance
+        # A loop through x is at least 2 * dist_back[x] long
+        dist, pred = self.distances_back(s, allowed, upper / 2)
+
+        indptr, indices = self.lengths.indptr, self.lengths.indices
+        lengths, quality = self.lengths.data, self.quality.data
+        mean_edge = lengths.mean() if len(lengths) else 1.0
+        budget = int(EXPANSIONS_PER_EDGE * target_length / mean_edge) + 1
+
+        def ordered_moves(x, length, visited):
+            cols = indices[indptr[x]:indptr[x + 1]]
+            step = lengths[indptr[x]:indptr[x + 1]]
+            unvisited = np.fromiter((c not in visited for c in cols), dtype=bool, count=len(cols))
+            ok = allowed[cols] & unvisited & (length + step + dist[cols] <= upper)
+            cols, step, q = cols[ok], step[ok], quality[indptr[x]:indptr[x + 1]][ok]
+            if len(cols) == 0:
+                return []
+            # Quality-weighted random order; on the first half prefer moving away from the start
+            weights = q + 0.05
+            if length < target_length / 2:
+                weights = weights * np.where(dist[cols] > dist[x], 2.0, 1.0)
+            order = rng.choice(len(cols), size=len(cols), replace=False, p=weights / weights.sum())
+            return list(zip(cols[order], step[order]))
+
+        found = {}
+        for _ in range(max_attempts):
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            route, visited, edges = [s], {s}, set()
+            route_length = [0.0]
+            stack = [ordered_moves(s, 0.0, visited)]
+            best, expansions = None, 0
+            while stack and expansions < budget:
+                if not stack[-1]:
+                    # Dead end: backtrack one node
+                    stack.pop()
+                    if len(route) > 1:
+                        last = route.pop()
+                        route_length.pop()
+                        visited.discard(last)
+                        edges.discard((min(last, route[-1]), max(last, route[-1])))
+                    continue
+                y, step = stack[-1].pop()
+                expansions += 1
+                x, length = route[-1], route_length[-1] + step
+                route.append(y)
+                route_length.append(length)
+                visited.add(y)
+                edges.add((min(x, y), max(x, y)))
+
+                potential = length + dist[y]
+                if abs(potential - target_length) <= tolerance:
+                    loop, overlap = self._close(route, dist, pred, edges)
+                    error = abs(potential - target_length)
+                    if overlap <= max_overlap * potential and (best is None or error < best["error"]):
+                        best = {"path": loop, "length": float(potential), "error": float(error),
+                                "overlap": float(overlap / potential)}
+                if potential > target_length:
+                    # Extensions only move further from the target: treat as a dead end
+                    stack.append([])
+                else:
+                    stack.append(ordered_moves(y, length, visited))
+                if best is not None and best["error"] <= tolerance / 10:
+                    break
+            if best is not None:
+                found.setdefault(tuple(best["path"]), best)
+
+        loops = []
+        for loop in found.values():
+            loop["quality"] = self._loop_quality(loop["path"])
+            loop["score"] = loop["error"] / tolerance + quality_weight * (1 - loop["quality"])
+            loop["path"] = [self.nodes[i] for i in loop["path"]]
+            loops.append(loop)
+        loops.sort(key=lambda loop: loop["score"])
+        return loops[:top_n]
+
+
+def _init_worker(search):
+    global _worker_state
+    _worker_state = search
+
+
+def _find_task(args):
+    start, polygon, nodes, options = args
+    return _worker_state.find(start, polygon=polygon, nodes=nodes, **options)
+
+
+def find_loops(G, starts, polygons=None, cells=None, target_length=42000, tolerance=2000, top_n=5, time_budget=60,
+               processes=None, seed=None, **options):
+    """
+    Loop search from several start nodes (e.g. one per Voronoi cell), in parallel worker
+    processes with `time_budget` seconds per start. `polygons` (shapes) or `cells` (node id
+    collections, e.g. from network_voronoi) optionally confine each search to its own cell.
+    Returns one list of loops (see LoopSearch.find) per start.
+    """
+    search = G if isinstance(G, LoopSearch) else LoopSearch(G)
+    polygons = [None] * len(starts) if polygons is None else list(polygons)
+    cells = [None] * len(starts) if cells is None else list(cells)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [
+        (start, polygon, nodes, dict(options, target_length=target_length, tolerance=tolerance, top_n=top_n,
+                                     time_budget=time_budget, seed=child))
+        for start, polygon, nodes, child in zip(starts, polygons, cells, seeds)
+    ]
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+    if processes <= 1:
+        _init_worker(search)
+        return [_find_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(search,)) as pool:
+        return list(pool.map(_find_task, tasks))
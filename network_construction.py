@@ -2,7 +2,9 @@
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
-import pickle
+import numpy as np
+import scipy.sparse as sp
+from graph_store import save_graph
 
 # File paths for the 3 datasets
 data_files = {
@@ -12,31 +14,48 @@ data_files = {
 }
 
 # Load datasets
-datasets = {name: pd.read_csv(path) for name, path in data_files.items()}
+def load_datasets(files=data_files):
+    return {name: pd.read_csv(path) for name, path in files.items()}
 
 # Build the Wikidata editor network
 def build_network(df):
+    """
+    Builds the co-participation network: two editors are linked if they posted in the same thread.
+    Users and threads are factorized into a sparse user x thread incidence matrix A, and A @ A.T
+    gives the number of shared threads for every user pair, stored as the edge "weight".
+    """
+    df = df.dropna(subset=["page_name", "thread_subject", "username"])
+    user_codes, users = pd.factorize(df["username"])
+    thread_codes, _ = pd.MultiIndex.from_frame(df[["page_name", "thread_subject"]]).factorize()
+
+    # Binary incidence matrix (an editor posting several times in a thread counts once)
+    incidence = sp.csr_matrix(
+        (np.ones(len(df), dtype=np.int32), (user_codes, thread_codes)),
+        shape=(len(users), thread_codes.max() + 1 if len(df) else 0)
+    )
+    incidence.data[:] = 1
+
+    # Shared-thread counts; keep the strict upper triangle so each pair appears once
+    shared = sp.triu(incidence @ incidence.T, k=1).tocoo()
+
     G = nx.Graph()
-    for (_, group) in df.groupby(["page_name", "thread_subject"]):
-        users = group["username"].unique()
-        for i, user1 in enumerate(users):
-            for user2 in users[i + 1:]:
-                G.add_edge(user1, user2)
+    G.add_weighted_edges_from(zip(users[shared.row], users[shared.col], shared.data.tolist()))
     return G
 
 # Construct networks
-networks = {name: build_network(df) for name, df in datasets.items()}
-
-# Print basic stats
-network_stats = {
-    name: {
-        "num_nodes": G.number_of_nodes(),
-        "num_edges": G.number_of_edges(),
-        "density": nx.density(G)
+def build_networks(datasets):
+    return {name: build_network(df) for name, df in datasets.items()}
+
+# Basic stats
+def network_stats(networks):
+    return {
+        name: {
+            "num_nodes": G.number_of_nodes(),
+            "num_edges": G.number_of_edges(),
+            "density": nx.density(G)
+        }
+        for name, G in networks.items()
     }
-    for name, G in networks.items()
-}
-print(network_stats)
 
 # Optional visualization (sampled)
 def plot_network(G, title, sample_size=200):
@@ -47,15 +66,26 @@ def plot_network(G, title, sample_size=200):
     plt.title(title)
     plt.show()
 
-for name, G in networks.items():
-    plot_network(G, f"{name} Network (Sampled)")
+def plot_networks(networks):
+    for name, G in networks.items():
+        plot_network(G, f"{name} Network (Sampled)")
+
+# Save graphs in the memory-mapped CSR store for later use (see graph_store.py)
+store_paths = {
+    "ADMINISTRATORS": "admin_graph.csr",
+    "BOT_REQUESTS": "bot_graph.csr",
+    "REQUEST_FOR_DELETION": "deletion_graph.csr"
+}
+
+def save_networks(networks, paths=store_paths):
+    for name, path in paths.items():
+        save_graph(networks[name], path)
+    return dict(paths)
 
-# Save graphs as .pkl for later use
-with open("admin_graph.pkl", "wb") as f:
-    pickle.dump(networks["ADMINISTRATORS"], f)
-with open("bot_graph.pkl", "wb") as f:
-    pickle.dump(networks["BOT_REQUESTS"], f)
-with open("deletion_graph.pkl", "wb") as f:
-    pickle.dump(networks["REQUEST_FOR_DELETION"], f)
 
-print("Graphs have been saved successfully.")
+if __name__ == "__main__":
+    networks = build_networks(load_datasets())
+    print(network_stats(networks))
+    plot_networks(networks)
+    save_networks(networks)
+    print("Graphs have been saved successfully.")
@@ -0,0 +1,179 @@
+# network_kfunction.py
+# Network-constrained K-function and kernel density for accidents snapped to the road graph.
+#
+# Accidents happen on roads, so Euclidean statistics overstate how close two events are.
+# Distances here are shortest-path distances along the projected OSMnx graph. Instead of
+# all-pairs shortest paths, a distance-cutoff Dijkstra is run (in batches) only from the
+# nodes at the ends of edges that carry events, and the resulting node-to-node "distance
+# bands" (every node within the cutoff, as a sparse matrix) are cached on disk, keyed by the
+# graph and cutoff. An event at offset a along edge (u, v) of length L reaches a node x in
+# min(a + d(u, x), L - a + d(v, x)), and two events on the same edge are |a_i - a_j| apart.
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+CACHE_DIR = os.path.join(".cache", "network_bands")
+
+# Sources x nodes cells of the dense Dijkstra block computed at once
+MAX_BLOCK_CELLS = 20_000_000
+
+KERNELS = {
+    "quartic": lambda u: 15 / 16 * (1 - u ** 2) ** 2,
+    "epanechnikov": lambda u: 0.75 * (1 - u ** 2),
+    "triangular": lambda u: 1 - np.abs(u),
+    "uniform": lambda u: np.full_like(u, 0.5)
+}
+
+
+class RoadNetwork:
+    """
+    Undirected CSR view of a projected OSMnx graph, weighted by the shortest parallel edge length.
+    """
+
+    def __init__(self, G_proj, weight="length"):
+        self.nodes = list(G_proj.nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        edges = pd.DataFrame(
+            [(self.index[u], self.index[v], d[weight]) for u, v, d in G_proj.edges(data=True)],
+            columns=["u", "v", "length"]
+        )
+        # Undirected segments: one row per node pair, keeping the shortest parallel edge
+        a, b = np.minimum(edges["u"], edges["v"]), np.maximum(edges["u"], edges["v"])
+        segments = edges.assign(u=a, v=b).query("u != v").groupby(["u", "v"], as_index=False)["length"].min()
+        self.total_length = float(segments["length"].sum())
+        n = len(self.nodes)
+        rows = np.concatenate([segments["u"], segments["v"]])
+        cols = np.concatenate([segments["v"], segments["u"]])
+        self.csr = sp.csr_matrix((np.concatenate([segments["length"]] * 2), (rows, cols)), shape=(n, n))
+
+    def fingerprint(self):
+        digest = hashlib.sha256()
+        for array in (self.csr.indptr, self.csr.indices, self.csr.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()[:16]
+
+
+def distance_bands(network, sources, cutoff, cache_dir=CACHE_DIR):
+    """
+    Shortest-path distances from each node in `sources` to every node within `cutoff`, as a
+    sparse (len(sources) x n) matrix. Stored explicit zeros are kept for the source itself.
+    """
+    sources = np.unique(np.asarray(sources, dtype=np.int64))
+    cache_path = None
+    if cache_dir is not None:
+        key = hashlib.sha256(f"{network.fingerprint()}-{cutoff}".encode() + sources.tobytes()).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"bands-{key}.npz")
+        if os.path.exists(cache_path):
+            cached = np.load(cache_path)
+            return sources, sp.csr_matrix((cached["data"], cached["indices"], cached["indptr"]),
+                                          shape=tuple(cached["shape"]))
+
+    n = network.csr.shape[0]
+    step = max(1, MAX_BLOCK_CELLS // max(n, 1))
+    blocks = []
+    for start in range(0, len(sources), step):
+        D = csgraph.dijkstra(network.csr, directed=False, indices=sources[start:start + step], limit=cutoff)
+        rows, cols = np.nonzero(np.isfinite(D))
+        # Offset by 1 so zero distances (the sources themselves) survive as explicit entries
+        block = sp.csr_matrix((D[rows, cols] + 1.0, (rows, cols)), shape=D.shape)
+        block.data -= 1.0
+        blocks.append(block)
+    bands = sp.vstack(blocks, format="csr") if blocks else sp.csr_matrix((0, n))
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(cache_path, data=bands.data, indices=bands.indices, indptr=bands.indptr, shape=bands.shape)
+    return sources, bands
+
+
+def network_events(network, snapped):
+    """
+    Event arrays from edge_snapping output: end nodes, distance to each end and a segment id
+    with the position measured from the segment's lower-numbered node.
+    """
+    u = np.array([network.index[node] for node in snapped["u"]])
+    v = np.array([network.index[node] for node in snapped["v"]])
+    length = snapped["edge_length"].to_numpy(dtype=float)
+    to_u = snapped["offset"].to_numpy(dtype=float)
+    to_v = length - to_u
+    low, high = np.minimum(u, v), np.maximum(u, v)
+    position = np.where(u <= v, to_u, to_v)
+    segment = pd.MultiIndex.from_arrays([low, high, np.round(length, 3)]).factorize()[0]
+    return {"u": u, "v": v, "to_u": to_u, "to_v": to_v, "segment": segment, "position": position}
+
+
+def _band_rows(bands, row_of, node, extra, scratch, touched):
+    """
+    Writes min(scratch, extra + d(node, x)) for every x within the band of `node`.
+    """
+    r = row_of[node]
+    cols = bands.indices[bands.indptr[r]:bands.indptr[r + 1]]
+    vals = bands.data[bands.indptr[r]:bands.indptr[r + 1]] + extra
+    np.minimum.at(scratch, cols, vals)
+    touched.append(cols)
+
+
+def _prepare(G_proj, snapped, cutoff, cache_dir):
+    network = G_proj if isinstance(G_proj, RoadNetwork) else RoadNetwork(G_proj)
+    events = network_events(network, snapped)
+    sources, bands = distance_bands(network, np.concatenate([events["u"], events["v"]]), cutoff, cache_dir)
+    row_of = np.full(len(network.nodes), -1, dtype=np.int64)
+    row_of[sources] = np.arange(len(sources))
+    return network, events, bands, row_of
+
+
+def network_k_function(G_proj, snapped, radii, cache_dir=CACHE_DIR):
+    """
+    Network K-function of the snapped events at the given radii (metres):
+    K(r) = L / (n (n - 1)) * #{ordered pairs i != j with network distance <= r},
+    where L is the total road length. Returns a DataFrame (radius, pairs, K).
+    """
+    radii = np.sort(np.asarray(radii, dtype=float))
+    network, events, bands, row_of = _prepare(G_proj, snapped, radii[-1], cache_dir)
+    n_events = len(events["u"])
+    counts = np.zeros(len(radii) + 1, dtype=np.int64)
+    by_segment = pd.Series(np.arange(n_events)).groupby(events["segment"]).indices
+    scratch = np.full(len(network.nodes), np.inf)
+
+    for i in range(n_events):
+        touched = []
+        _band_rows(bands, row_of, events["u"][i], events["to_u"][i], scratch, touched)
+        _band_rows(bands, row_of, events["v"][i], events["to_v"][i], scratch, touched)
+        d = np.minimum(scratch[events["u"]] + events["to_u"], scratch[events["v"]] + events["to_v"])
+        same = by_segment[events["segment"][i]]
+        d[same] = np.minimum(d[same], np.abs(events["position"][same] - events["position"][i]))
+        d[i] = np.inf
+        counts += np.bincount(np.searchsorted(radii, d[d <= radii[-1]]), minlength=len(radii) + 1)
+        scratch[np.concatenate(touched)] = np.inf
+
+    pairs = np.cumsum(counts[:-1])
+    k_values = network.total_length / (n_events * (n_events - 1)) * pairs if n_events > 1 else np.zeros(len(radii))
+    return pd.DataFrame({"radius": radii, "pairs": pairs, "K": k_values})
+
+
+def network_kde(G_proj, snapped, bandwidth, kernel="quartic", cache_dir=CACHE_DIR):
+    """
+    Simple network kernel density at every graph node: sum over events of K(d / h) / h with
+    d the network distance from the node to the event and h the bandwidth (metres).
+    Returns a Series indexed by node id.
+    """
+    kernel_fn = KERNELS[kernel]
+    network, events, bands, row_of = _prepare(G_proj, snapped, bandwidth, cache_dir)
+    density = np.zeros(len(network.nodes))
+    scratch = np.full(len(network.nodes), np.inf)
+
+    for j in range(len(events["u"])):
+        touched = []
+        _band_rows(bands, row_of, events["u"][j], events["to_u"][j], scratch, touched)
+        _band_rows(bands, row_of, events["v"][j], events["to_v"][j], scratch, touched)
+        nodes = np.unique(np.concatenate(touched))
+        d = scratch[nodes]
+        inside = d < bandwidth
+        density[nodes[inside]] += kernel_fn(d[inside] / bandwidth) / bandwidth
+        scratch[nodes] = np.inf
+
+    return pd.Series(density, index=network.nodes, name="density")
@@ -1,24 +1,30 @@
 import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
-import sys
-
-# Import Task A results
-sys.path.append("D:/CW Newtrok/")
-from network_construction import networks
+from path_length import estimate_average_shortest_path_length
+from clustering import clustering_summary
+from null_models import null_model_ensemble
+from centrality import centrality_summary
 
 # Function to compute network metrics
-def compute_network_metrics(G):
+def compute_network_metrics(G, path_sources=256, processes=None):
     """
     Compute key network metrics.
+    Path length is measured on the largest connected component (sampled BFS on large graphs).
     """
+    paths = estimate_average_shortest_path_length(G, n_sources=path_sources, processes=processes, seed=42)
+    clustering = clustering_summary(G)
     metrics = {
         "num_nodes": G.number_of_nodes(),
         "num_edges": G.number_of_edges(),
         "density": nx.density(G),
         "avg_degree": np.mean([deg for _, deg in G.degree()]),
-        "clustering_coefficient": nx.average_clustering(G),
-        "avg_path_length": nx.average_shortest_path_length(G) if nx.is_connected(G) else None
+        "clustering_coefficient": clustering["average_clustering"],
+        "transitivity": clustering["transitivity"],
+        "avg_path_length": paths["avg_path_length"],
+        "avg_path_length_ci": (paths["ci_low"], paths["ci_high"]),
+        "effective_diameter": paths["effective_diameter"],
+        "lcc_fraction": paths["lcc_fraction"]
     }
     return metrics
 
@@ -36,27 +42,59 @@ def plot_degree_distribution(G, title):
     plt.yscale("log")
     plt.show()
 
-# Function to compare with a random network
-def compare_with_random_network(G, name):
+# Function to compare with an ensemble of random networks
+def compare_with_random_network(G, name, model="gnm", n_samples=20, processes=None):
     """
-    Compare the real network with a random Erdős–Rényi network.
+    Compare the real network with an ensemble of random null models (see null_models.py).
+    Reports the null means together with z-scores and percentiles of the real values.
     """
-    num_nodes = G.number_of_nodes()
-    num_edges = G.number_of_edges()
-    p = (2 * num_edges) / (num_nodes * (num_nodes - 1))  # Probability for ER model
-    
-    random_G = nx.erdos_renyi_graph(num_nodes, p)
-    
+    ensemble = null_model_ensemble(G, model=model, n_samples=n_samples, processes=processes, seed=42)
+    clustering, paths = ensemble["clustering"], ensemble["path_length"]
+
     comparison = {
-        "real_avg_clustering": nx.average_clustering(G),
-        "random_avg_clustering": nx.average_clustering(random_G),
-        "real_avg_path_length": nx.average_shortest_path_length(G) if nx.is_connected(G) else None,
-        "random_avg_path_length": nx.average_shortest_path_length(random_G) if nx.is_connected(random_G) else None,
+        "null_model": model,
+        "real_avg_clustering": clustering["real"],
+        "random_avg_clustering": clustering["null_mean"],
+        "clustering_z_score": clustering["z_score"],
+        "clustering_percentile": clustering["percentile"],
+        "real_avg_path_length": paths["real"],
+        "random_avg_path_length": paths["null_mean"],
+        "path_length_z_score": paths["z_score"],
+        "path_length_percentile": paths["percentile"],
     }
     print(f"Comparison for {name}:", comparison)
+    return comparison
+
+# Compute metrics and compare every network with its random ensemble
+def analyse_networks(networks):
+    results = {}
+    for name, G in networks.items():
+        metrics = compute_network_metrics(G)
+        print(f"Metrics for {name}: {metrics}")
+        results[name] = {"metrics": metrics, "random_comparison": compare_with_random_network(G, name)}
+    return results
+
+# Rank editors by approximate centralities, cached per graph (see centrality.py)
+def rank_editors(networks, top=10, samples=256, processes=None):
+    rankings = {}
+    for name, G in networks.items():
+        summary = centrality_summary(G, samples=samples, processes=processes, seed=42)
+        table = summary["centrality"].sort_values("betweenness", ascending=False)
+        print(f"Top {top} editors by betweenness for {name} "
+              f"(all estimates within ±{summary['betweenness_error_bound']:.4f} with 95% probability):")
+        print(table.head(top))
+        rankings[name] = table
+    return rankings
+
+def plot_degree_distributions(networks):
+    for name, G in networks.items():
+        plot_degree_distribution(G, name)
+
 
-# Compute metrics, plot distributions, and compare networks
-for name, G in networks.items():
-    print(f"Metrics for {name}: {compute_network_metrics(G)}")
-    plot_degree_distribution(G, name)
-    compare_with_random_network(G, name)
+if __name__ == "__main__":
+    # Reuse the networks cached by the pipeline instead of rebuilding them (see pipeline.py)
+    from pipeline import build_pipeline
+    networks = build_pipeline().get("networks")
+    analyse_networks(networks)
+    rank_editors(networks)
+    plot_degree_distributions(networks)
@@ -0,0 +1,108 @@
+# null_models.py
+# Ensembles of random null graphs for comparing the editor networks against chance.
+#
+# A single Erdős–Rényi sample says little about whether the real clustering or path length
+# is unusual. Here N null graphs are generated across worker processes, each with its own
+# seed spawned from one SeedSequence (so results are reproducible for any worker count),
+# and the real values are reported as z-scores and percentiles of the null distribution.
+#
+# Models:
+#   gnm            - uniform graph with the same number of nodes and edges, G(n, m)
+#   gnp            - G(n, p) with the same expected density (fast sparse generator)
+#   configuration  - configuration model on the real degree sequence (self-loops and
+#                    multi-edges collapsed, so degrees are preserved approximately)
+#   edge_swap      - degree-preserving double-edge swaps of the real graph
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import networkx as nx
+from scipy.stats import percentileofscore
+from clustering import average_clustering
+from path_length import estimate_average_shortest_path_length
+
+NULL_MODELS = ("gnm", "gnp", "configuration", "edge_swap")
+
+# Double-edge swaps per edge for the edge_swap model
+SWAPS_PER_EDGE = 10
+
+_worker_state = None
+
+
+def _init_worker(model, n, edges, path_sources):
+    global _worker_state
+    _worker_state = {"model": model, "n": n, "edges": edges, "path_sources": path_sources}
+
+
+def generate_null_graph(model, n, edges, seed):
+    """
+    Draws one null graph for a graph with `n` nodes and the (m x 2) integer edge array `edges`.
+    """
+    m = len(edges)
+    if model == "gnm":
+        if m > n * (n - 1) / 4:
+            return nx.dense_gnm_random_graph(n, m, seed=seed)
+        return nx.gnm_random_graph(n, m, seed=seed)
+    if model == "gnp":
+        p = 2 * m / (n * (n - 1)) if n > 1 else 0.0
+        return nx.fast_gnp_random_graph(n, p, seed=seed)
+    if model == "configuration":
+        degrees = np.bincount(edges.ravel(), minlength=n).tolist()
+        H = nx.Graph(nx.configuration_model(degrees, seed=seed))
+        H.remove_edges_from(nx.selfloop_edges(H))
+        return H
+    if model == "edge_swap":
+        H = nx.empty_graph(n)
+        H.add_edges_from(edges.tolist())
+        if m >= 2 and n >= 4:
+            nx.double_edge_swap(H, nswap=SWAPS_PER_EDGE * m, max_tries=100 * SWAPS_PER_EDGE * m, seed=seed)
+        return H
+    raise ValueError(f"Unknown null model {model!r}, expected one of {NULL_MODELS}")
+
+
+def _null_sample(seed):
+    state = _worker_state
+    H = generate_null_graph(state["model"], state["n"], state["edges"], seed)
+    paths = estimate_average_shortest_path_length(H, n_sources=state["path_sources"], processes=1, seed=seed)
+    return average_clustering(H), paths["avg_path_length"]
+
+
+def _summarize(real, samples):
+    samples = np.asarray(samples, dtype=float)
+    std = samples.std(ddof=1) if len(samples) > 1 else 0.0
+    return {
+        "real": real,
+        "null_mean": float(samples.mean()),
+        "null_std": float(std),
+        "z_score": float((real - samples.mean()) / std) if std > 0 else float("nan"),
+        "percentile": float(percentileofscore(samples, real, kind="mean"))
+    }
+
+
+def null_model_ensemble(G, model="gnm", n_samples=20, processes=None, seed=42, path_sources=128):
+    """
+    Compares the average clustering and average path length (LCC) of G with `n_samples`
+    null graphs of the given model, generated in parallel.
+    """
+    if model not in NULL_MODELS:
+        raise ValueError(f"Unknown null model {model!r}, expected one of {NULL_MODELS}")
+    index = {node: i for i, node in enumerate(G.nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_samples)]
+    initargs = (model, len(index), edges, path_sources)
+
+    processes = min(processes or os.cpu_count() or 1, n_samples)
+    if processes <= 1:
+        _init_worker(*initargs)
+        samples = [_null_sample(s) for s in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=initargs) as pool:
+            samples = list(pool.map(_null_sample, seeds))
+
+    real_paths = estimate_average_shortest_path_length(G, n_sources=path_sources, seed=seed)
+    return {
+        "model": model,
+        "n_samples": n_samples,
+        "clustering": _summarize(average_clustering(G), [c for c, _ in samples]),
+        "path_length": _summarize(real_paths["avg_path_length"], [p for _, p in samples])
+    }
@@ -0,0 +1,134 @@
+# osm_cache.py
+# Offline on-disk cache for the OSMnx road graphs used by the spatial scripts.
+#
+# spatial_network.py, accident_analysis.py and Voronoi_diagrams.py each download and simplify
+# the same graphs with ox.graph_from_point on every run. load_road_graph keys a cache entry by
+# (centre, dist, network_type, simplify), stores the graph (and its ox.project_graph variant)
+# as a binary pickle, and on a cache miss builds the graph from a local OSM XML extract when
+# one is given, so the scripts also run without network access. The scripts do not pass an
+# extract themselves: set EXTRACT_PATH or the OSM_EXTRACT environment variable instead, e.g.
+#
+#   OSM_EXTRACT=leeds.osm python Voronoi_diagrams.py
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import osmnx as ox
+
+CACHE_DIR = os.path.join(".cache", "osm")
+
+# Extract used when load_road_graph gets no extract_path (falls back to $OSM_EXTRACT)
+EXTRACT_PATH = None
+
+# Overpass tag clauses such as ["highway"!~"footway|path"] used by OSMnx network types
+FILTER_CLAUSE = re.compile(r'\["([^"]+)"(?:(!?~)"([^"]*)")?\]')
+
+
+def cache_key(center_point, dist, network_type, simplify):
+    params = {
+        "center": [round(center_point[0], 6), round(center_point[1], 6)],
+        "dist": dist,
+        "network_type": network_type,
+        "simplify": simplify
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _write(G, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _matches_network_type(data, clauses):
+    for key, op, pattern in clauses:
+        value = data.get(key)
+        if op == "":
+            if value is None:
+                return False
+        elif value is not None:
+            found = re.search(pattern, str(value)) is not None
+            if found != (op == "~"):
+                return False
+    return True
+
+
+def network_filter(network_type):
+    """
+    OSMnx's own Overpass tag filter for `network_type`, so offline graphs are filtered exactly
+    like downloaded ones. OSMnx only has this as a private helper (present in the 2.x series),
+    so a missing helper is an error rather than a silent switch to a different filter.
+    """
+    get_filter = getattr(getattr(ox, "_overpass", None), "_get_network_filter", None)
+    if get_filter is None:
+        raise RuntimeError(f"osmnx {ox.__version__} has no ox._overpass._get_network_filter; building graphs "
+                           "from extracts needs osmnx 2.x (pip install 'osmnx>=2,<3')")
+    return get_filter(network_type)
+
+
+def graph_from_extract(extract_path, center_point, dist, network_type="drive", simplify=True):
+    """
+    Builds the equivalent of ox.graph_from_point from a local .osm/.xml extract: edges are
+    filtered with OSMnx's own tag filter for `network_type`, the graph is truncated to the
+    bounding box around the centre, reduced to its largest component and optionally simplified.
+    """
+    if extract_path.endswith(".pbf"):
+        raise ValueError("OSMnx reads OSM XML only; convert the extract first, e.g. `osmium cat extract.osm.pbf -o extract.osm`")
+    clauses = FILTER_CLAUSE.findall(network_filter(network_type))
+    # graph_from_xml keeps only ox.settings.useful_tags_way, so the filter's keys (motor_vehicle,
+    # foot, sidewalk, ...) are added for the load; tags OSMnx would not keep are dropped again
+    useful_tags = ox.settings.useful_tags_way
+    extra_tags = sorted({key for key, _, _ in clauses} - set(useful_tags))
+    ox.settings.useful_tags_way = list(useful_tags) + extra_tags
+    try:
+        G = ox.graph_from_xml(extract_path, bidirectional=network_type in ("walk", "bike", "all"),
+                              simplify=False, retain_all=True)
+    finally:
+        ox.settings.useful_tags_way = useful_tags
+    G.remove_edges_from([(u, v, k) for u, v, k, d in G.edges(keys=True, data=True)
+                         if not _matches_network_type(d, clauses)])
+    for _, _, d in G.edges(data=True):
+        for tag in extra_tags:
+            d.pop(tag, None)
+    G.remove_nodes_from([n for n, deg in G.degree() if deg == 0])
+    G = ox.truncate.truncate_graph_bbox(G, ox.utils_geo.bbox_from_point(center_point, dist))
+    G = ox.truncate.largest_component(G)
+    return ox.simplify_graph(G) if simplify else G
+
+
+def load_road_graph(center_point, dist, network_type="drive", simplify=True, projected=False,
+                    cache_dir=CACHE_DIR, extract_path=None):
+    """
+    Cached drop-in for ox.graph_from_point (plus ox.project_graph when projected=True).
+    On a miss the graph comes from `extract_path` (default: EXTRACT_PATH, then $OSM_EXTRACT)
+    when that file exists, else from Overpass.
+    """
+    extract_path = extract_path or EXTRACT_PATH or os.environ.get("OSM_EXTRACT")
+    key = cache_key(center_point, dist, network_type, simplify)
+    path = os.path.join(cache_dir, f"graph-{key}.pkl")
+    projected_path = os.path.join(cache_dir, f"graph-{key}-projected.pkl")
+
+    if projected and os.path.exists(projected_path):
+        return _read(projected_path)
+    if os.path.exists(path):
+        G = _read(path)
+    else:
+        if extract_path is not None and os.path.exists(extract_path):
+            G = graph_from_extract(extract_path, center_point, dist, network_type, simplify)
+        else:
+            G = ox.graph_from_point(center_point, dist=dist, network_type=network_type, simplify=simplify)
+        _write(G, path)
+    if not projected:
+        return G
+    G_proj = ox.project_graph(G)
+    _write(G_proj, projected_path)
+    return G_proj
@@ -0,0 +1,286 @@
+# pipeline.py
+# Lazy, cached runner for the coursework stages.
+#
+# network_metrics.py used to `from network_construction import networks`, which reread every
+# CSV, rebuilt the three graphs, opened the spring-layout plots and rewrote the pickles before
+# a single metric was computed. Each stage is now a plain function registered with declared
+# inputs and outputs. A stage's key hashes its function source together with the source of
+# every repository module it imports (directly or through other repository modules), its
+# parameters, the contents of the files it reads and the keys of the stages it depends on,
+# so editing a helper that a stage calls invalidates it too. Outputs are pickled under
+# .cache/pipeline by that key. Asking for an artifact runs only the stages whose key changed,
+# and an up-to-date artifact is loaded without touching its upstream stages at all.
+# Interactive stages (plots) are skipped in headless mode.
+#
+#   python pipeline.py metrics centrality epidemic --headless
+#   python pipeline.py spatial --force accidents
+
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import textwrap
+
+CACHE_DIR = os.path.join(".cache", "pipeline")
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ACCIDENT_FOLDER = "C:/Users/86153/Downloads/"
+LEEDS_CENTRE = (53.7965, -1.5478)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_main_block(node):
+    test = node.test if isinstance(node, ast.If) else None
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__")
+
+
+def _repo_imports(nodes):
+    """
+    Names of the repository modules imported anywhere in the given statements, except under
+    `if __name__ == "__main__":` (script entry points are not dependencies).
+    """
+    names = set()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if _is_main_block(node):
+            continue
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+        stack.extend(ast.iter_child_nodes(node))
+    return {name for name in names if os.path.exists(os.path.join(REPO_DIR, f"{name}.py"))}
+
+
+def module_dependencies(names):
+    """
+    The given repository modules and every repository module they import, transitively.
+    """
+    seen = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(REPO_DIR, f"{name}.py"), encoding="utf-8") as f:
+            stack.extend(_repo_imports(ast.parse(f.read()).body))
+    return seen
+
+
+class Stage:
+    """
+    One pipeline step: `func(*input values, **params)` returns its outputs (a tuple when
+    several are declared). `files` are read by the stage and hashed into its key.
+    cache=False is for stages with their own cache (or cheap ones); interactive=True marks
+    stages with side effects only, such as plots, which headless runs skip.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), params=None, files=(), cache=True, interactive=False):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.params = dict(params or {})
+        self.files = tuple(files)
+        self.cache = cache and bool(self.outputs)
+        self.interactive = interactive
+
+    def code_hash(self):
+        """
+        Hash of the function's module and of the repository modules the function can reach:
+        the imports at the top of its module and inside its body, followed transitively.
+        """
+        try:
+            source = inspect.getsource(self.func)
+            module_file = inspect.getsourcefile(self.func)
+        except (OSError, TypeError):
+            return hashlib.sha256(f"{self.func.__module__}.{self.func.__qualname__}".encode()).hexdigest()
+        with open(module_file, encoding="utf-8") as f:
+            module_tree = ast.parse(f.read())
+        top_level = [node for node in module_tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+        own = os.path.splitext(os.path.basename(module_file))[0]
+        imported = _repo_imports(top_level) | _repo_imports(ast.parse(textwrap.dedent(source)).body)
+        digest = hashlib.sha256(source.encode())
+        digest.update(file_hash(module_file).encode())
+        for name in sorted(module_dependencies(imported) - {own}):
+            digest.update(name.encode())
+            digest.update(file_hash(os.path.join(REPO_DIR, f"{name}.py")).encode())
+        return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    Registry of stages with dependency resolution through their declared inputs/outputs.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, headless=False):
+        self.cache_dir = cache_dir
+        self.headless = headless
+        self.stages = {}
+        self.producers = {}
+        self._keys = {}
+        self._values = {}
+        self._forced = set()
+
+    def add(self, name, func, **options):
+        stage = Stage(name, func, **options)
+        for output in stage.outputs:
+            if output in self.producers:
+                raise ValueError(f"Output {output!r} is already produced by stage {self.producers[output]!r}")
+            self.producers[output] = name
+        self.stages[name] = stage
+        return stage
+
+    def key(self, name):
+        """
+        Content hash of a stage: code, parameters, input files and upstream keys.
+        """
+        if name not in self._keys:
+            stage = self.stages[name]
+            upstream = [self.key(self.producers[i]) for i in stage.inputs]
+            spec = json.dumps({
+                "stage": name,
+                "code": stage.code_hash(),
+                "params": stage.params,
+                "files": {path: file_hash(path) for path in stage.files},
+                "upstream": upstream
+            }, sort_keys=True, default=str)
+            self._keys[name] = hashlib.sha256(spec.encode()).hexdigest()[:16]
+        return self._keys[name]
+
+    def _artifact_path(self, output):
+        return os.path.join(self.cache_dir, f"{output}-{self.key(self.producers[output])}.pkl")
+
+    def _run_stage(self, name):
+        stage = self.stages[name]
+        print(f"[pipeline] running {name}")
+        result = stage.func(*(self.get(i) for i in stage.inputs), **stage.params)
+        values = result if len(stage.outputs) > 1 else (result,)
+        for output, value in zip(stage.outputs, values):
+            self._values[output] = value
+            if stage.cache:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = self._artifact_path(output)
+                with open(path + ".tmp", "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(path + ".tmp", path)
+
+    def get(self, output):
+        """
+        Value of one artifact: from memory, from the cache if its key is unchanged, or by
+        running its stage (and, only as needed, the stages upstream of it).
+        """
+        if output not in self._values:
+            name = self.producers[output]
+            stage = self.stages[name]
+            path = self._artifact_path(output) if stage.cache else None
+            if path is not None and name not in self._forced and os.path.exists(path):
+                with open(path, "rb") as f:
+                    self._values[output] = pickle.load(f)
+            else:
+                self._run_stage(name)
+        return self._values[output]
+
+    def run(self, targets=None, force=()):
+        """
+        Brings the given stages (default: all) up to date and returns their outputs.
+        Stages in `force` are rerun even when their cached outputs are current.
+        """
+        self._forced = set(force)
+        results = {}
+        for name in targets or list(self.stages):
+            stage = self.stages[name]
+            if stage.interactive and self.headless:
+                print(f"[pipeline] skipping {name} (headless)")
+                continue
+            if stage.outputs:
+                results.update({output: self.get(output) for output in stage.outputs})
+            else:
+                print(f"[pipeline] running {name}")
+                stage.func(*(self.get(i) for i in stage.inputs), **stage.params)
+        return results
+
+
+def load_spatial_inputs(folder_path):
+    from accident_index import load_accident_index
+    return load_accident_index(folder_path)
+
+
+def load_leeds_roads(center_point, dist):
+    from osm_cache import load_road_graph
+    return load_road_graph(center_point, dist=dist, network_type="drive", simplify=True, projected=True)
+
+
+def spatial_summary(accident_index, G_proj, permutations=999):
+    """
+    Snaps the accidents inside the projected road graph's hull to edges and runs the hotspot
+    analysis.
+    """
+    from accident_data import accidents_to_gdf
+    from edge_snapping import snap_points
+    from spatial_autocorrelation import accident_hotspots
+    from study_area import AreaFilter, hull_from_nodes
+
+    points = accidents_to_gdf(accident_index.frame, crs=G_proj.graph["crs"])
+    points = AreaFilter(points).within(hull_from_nodes(G_proj))
+    snapped = snap_points(G_proj, points.geometry.x.to_numpy(), points.geometry.y.to_numpy())
+    moran, lisa = accident_hotspots(points["easting"], points["northing"], permutations=permutations, seed=42)
+    print(f"Accidents in study area: {len(points)}; global Moran's I {moran['I']:.4f} (p = {moran['p_sim']:.4f})")
+    return {"accidents": len(points), "snapped": snapped, "global_moran": moran, "local_moran": lisa}
+
+
+def build_pipeline(cache_dir=CACHE_DIR, headless=False):
+    """
+    The coursework stages: ingest -> graphs -> metrics / centrality / epidemic, and
+    accidents + roads -> spatial.
+    """
+    import network_construction
+    import network_metrics
+    import epidemic_models
+    from accident_data import ACCIDENT_FILES, GUIDANCE_FILE
+
+    pipeline = Pipeline(cache_dir=cache_dir, headless=headless)
+    pipeline.add("ingest", network_construction.load_datasets, outputs=["datasets"],
+                 params={"files": network_construction.data_files},
+                 files=list(network_construction.data_files.values()))
+    pipeline.add("graphs", network_construction.build_networks, inputs=["datasets"], outputs=["networks"])
+    # Writes the .csr stores on every run so a deleted store is always rewritten
+    pipeline.add("store_graphs", network_construction.save_networks, inputs=["networks"], outputs=["graph_store"],
+                 cache=False)
+    pipeline.add("plot_graphs", network_construction.plot_networks, inputs=["networks"], interactive=True)
+    pipeline.add("metrics", network_metrics.analyse_networks, inputs=["networks"], outputs=["metrics"])
+    pipeline.add("centrality", network_metrics.rank_editors, inputs=["networks"], outputs=["centrality"])
+    pipeline.add("plot_degrees", network_metrics.plot_degree_distributions, inputs=["networks"], interactive=True)
+    pipeline.add("epidemic", epidemic_models.run_trolling_analysis, inputs=["networks"], outputs=["epidemic"],
+                 params={"seed": 42})
+    # Accident index and road graph keep their own caches (accident_index.py, osm_cache.py)
+    pipeline.add("accidents", load_spatial_inputs, outputs=["accident_index"],
+                 params={"folder_path": ACCIDENT_FOLDER}, cache=False,
+                 files=[os.path.join(ACCIDENT_FOLDER, name) for name in ACCIDENT_FILES + [GUIDANCE_FILE]])
+    pipeline.add("roads", load_leeds_roads, outputs=["road_graph"],
+                 params={"center_point": LEEDS_CENTRE, "dist": 1000}, cache=False)
+    pipeline.add("spatial", spatial_summary, inputs=["accident_index", "road_graph"], outputs=["spatial"])
+    return pipeline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run coursework stages with cached artifacts.")
+    parser.add_argument("stages", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--headless", action="store_true", help="skip interactive (plotting) stages")
+    parser.add_argument("--force", nargs="*", default=[], help="stages to rerun even if cached")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+    build_pipeline(cache_dir=args.cache_dir, headless=args.headless).run(args.stages or None, force=args.force)
@@ -0,0 +1,212 @@
+# prov_store.py
+# Append-only store for W3C PROV graphs with sparse, warm-started PageRank.
+#
+# task_d_marathon_provenance.py ran nx.pagerank on a hand-built nine-node DiGraph. Real
+# provenance logs have millions of entity/activity/agent records and keep growing, so
+# ProvGraph keeps node names and types in flat arrays and edges (source, target, label code)
+# in append-only NumPy chunks. PageRank is a power iteration over a sparse CSR matrix built
+# from those arrays. The last vector of each (alpha, personalization) setting is remembered,
+# and after new relations arrive the next run starts from it instead of from the uniform
+# vector, so it converges in a few iterations. Personalization can target node types (e.g.
+# rank everything by its proximity to agents) as well as individual nodes.
+
+import pickle
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+NODE_TYPES = ("entity", "activity", "agent")
+
+# Core PROV relations; other labels are accepted and interned on first use
+RELATIONS = (
+    "used",
+    "wasGeneratedBy",
+    "generated",
+    "wasAssociatedWith",
+    "wasAttributedTo",
+    "wasDerivedFrom",
+    "wasInformedBy",
+    "actedOnBehalfOf"
+)
+
+
+class ProvGraph:
+    """
+    Directed PROV graph with typed nodes and labelled edges. Repeated edges between the same
+    nodes add up to a heavier edge in the PageRank matrix.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.types = []
+        self.labels = list(RELATIONS)
+        self.label_index = {label: i for i, label in enumerate(self.labels)}
+        self._edges = []          # list of (src, dst, label) arrays, merged lazily
+        self._matrix = None       # cached (n_edges, CSR) pair
+        self._last = {}           # personalization key -> last PageRank vector
+        self.last_iterations = 0
+
+    # --- Building ---
+
+    def add_node(self, name, node_type):
+        """
+        Adds a node (or returns the existing one) and returns its position.
+        """
+        if node_type not in NODE_TYPES:
+            raise ValueError(f"Unknown PROV node type {node_type!r}; expected one of {NODE_TYPES}")
+        if name in self.index:
+            return self.index[name]
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.types.append(NODE_TYPES.index(node_type))
+        return self.index[name]
+
+    def add_nodes(self, names, node_type):
+        return [self.add_node(name, node_type) for name in names]
+
+    def _label_code(self, label):
+        if label not in self.label_index:
+            self.label_index[label] = len(self.labels)
+            self.labels.append(label)
+        return self.label_index[label]
+
+    def add_edges(self, sources, targets, label):
+        """
+        Adds one `label` relation for every (source, target) pair; the nodes must exist.
+        """
+        src = np.array([self.index[name] for name in sources], dtype=np.int64)
+        dst = np.array([self.index[name] for name in targets], dtype=np.int64)
+        if len(src) != len(dst):
+            raise ValueError("sources and targets must have the same length")
+        codes = np.full(len(src), self._label_code(label), dtype=np.int32)
+        self._edges.append((src, dst, codes))
+
+    def add_edge(self, source, target, label):
+        self.add_edges([source], [target], label)
+
+    # --- Access ---
+
+    def number_of_nodes(self):
+        return len(self.names)
+
+    def edge_arrays(self):
+        """
+        All edges as (source positions, target positions, label codes), merged into one chunk.
+        """
+        if len(self._edges) != 1:
+            if self._edges:
+                self._edges = [tuple(np.concatenate(parts) for parts in zip(*self._edges))]
+            else:
+                self._edges = [(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int32))]
+        return self._edges[0]
+
+    def number_of_edges(self):
+        return len(self.edge_arrays()[0])
+
+    def type_array(self):
+        return np.asarray(self.types, dtype=np.int8)
+
+    def nodes_of_type(self, node_type):
+        return [self.names[i] for i in np.flatnonzero(self.type_array() == NODE_TYPES.index(node_type))]
+
+    def adjacency(self):
+        """
+        Weighted CSR adjacency matrix (n x n), rebuilt only when nodes or edges were added.
+        """
+        src, dst, _ = self.edge_arrays()
+        n = self.number_of_nodes()
+        if self._matrix is None or self._matrix[0] != len(src) or self._matrix[1].shape[0] != n:
+            A = sp.csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+            A.sum_duplicates()
+            self._matrix = (len(src), A)
+        return self._matrix[1]
+
+    # --- PageRank ---
+
+    def personalization_vector(self, personalization=None, node_types=None):
+        """
+        Teleport distribution: uniform, proportional to {node name: weight}, or spread evenly
+        over the nodes of the given types ({type: weight} or a list of types).
+        """
+        n = self.number_of_nodes()
+        if personalization is None and node_types is None:
+            return np.full(n, 1.0 / n)
+        p = np.zeros(n)
+        if personalization is not None:
+            for name, value in personalization.items():
+                p[self.index[name]] += value
+        if node_types is not None:
+            if not isinstance(node_types, dict):
+                node_types = {node_type: 1.0 for node_type in node_types}
+            types = self.type_array()
+            for node_type, weight in node_types.items():
+                members = types == NODE_TYPES.index(node_type)
+                if members.any():
+                    p[members] += weight / members.sum()
+        if p.sum() <= 0:
+            raise ValueError("Personalization must give some node a positive weight")
+        return p / p.sum()
+
+    def pagerank(self, alpha=0.85, personalization=None, node_types=None, max_iter=100, tol=1e-06, warm_start=True):
+        """
+        PageRank by sparse power iteration, with the same conventions as nx.pagerank (dangling
+        nodes teleport according to the personalization, convergence when the L1 change is
+        below n * tol). With warm_start the previous result for the same settings is the
+        starting vector, with the new nodes seeded from the personalization.
+        Returns a Series indexed by node name; the iteration count is kept in last_iterations.
+        """
+        n = self.number_of_nodes()
+        if n == 0:
+            return pd.Series(dtype=float)
+        A = self.adjacency()
+        out_weight = np.asarray(A.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        inv = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+        # Row-stochastic transition matrix, transposed once for x <- P^T x
+        P_T = (sp.diags(inv) @ A).T.tocsr()
+        p = self.personalization_vector(personalization, node_types)
+
+        key = (alpha, repr(sorted(personalization.items())) if personalization else None,
+               repr(sorted(node_types.items()) if isinstance(node_types, dict) else node_types))
+        x = p.copy()
+        previous = self._last.get(key) if warm_start else None
+        if previous is not None and len(previous) <= n:
+            x[:len(previous)] = previous
+            x /= x.sum()
+
+        for iteration in range(1, max_iter + 1):
+            x_next = alpha * (P_T @ x + x[dangling].sum() * p) + (1 - alpha) * p
+            error = np.abs(x_next - x).sum()
+            x = x_next
+            if error < n * tol:
+                break
+        else:
+            raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+        self.last_iterations = iteration
+        self._last[key] = x
+        return pd.Series(x, index=self.names, name="pagerank")
+
+    # --- Conversion and persistence ---
+
+    def to_networkx(self):
+        """
+        nx.DiGraph with 'type' node attributes and 'label' edge attributes (for small graphs).
+        """
+        import networkx as nx
+        G = nx.DiGraph()
+        for name, code in zip(self.names, self.types):
+            G.add_node(name, type=NODE_TYPES[code])
+        for s, t, code in zip(*self.edge_arrays()):
+            G.add_edge(self.names[s], self.names[t], label=self.labels[code])
+        return G
+
+    def save(self, path):
+        self.edge_arrays()
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
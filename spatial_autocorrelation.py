@@ -0,0 +1,145 @@
+# spatial_autocorrelation.py
+# Global and local Moran's I for accident counts, with vectorized permutation inference.
+#
+# accident_analysis.py used to count accidents per location with groupby('geometry') (hashing
+# shapely objects) and to run esda's Moran on every accident row. Here accidents are
+# aggregated by their integer grid references, KNN weights come from a KD-tree (stored as a
+# dense n x k neighbour array, row-standardized), and permutations are evaluated in chunks of
+# NumPy arrays. Local (LISA) conditional permutations follow esda: one set of random
+# k-subsets of the other n - 1 locations is drawn per permutation and shared by all sites, and
+# site chunks are spread over worker processes. Each location gets a hotspot/coldspot label.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Sites x permutations x k cells held in memory per local-Moran chunk
+MAX_CHUNK_CELLS = 10_000_000
+
+QUADRANTS = {1: "HH", 2: "LH", 3: "LL", 4: "HL"}
+LABELS = {"HH": "hotspot", "LL": "coldspot", "HL": "high outlier", "LH": "low outlier"}
+
+_worker_state = None
+
+
+def aggregate_accidents(easting, northing):
+    """
+    Accident counts per distinct integer grid reference, as a DataFrame (easting, northing, count).
+    """
+    xy = np.column_stack([np.asarray(easting), np.asarray(northing)]).round().astype(np.int64)
+    locations, counts = np.unique(xy, axis=0, return_counts=True)
+    return pd.DataFrame({"easting": locations[:, 0], "northing": locations[:, 1], "count": counts})
+
+
+def knn_neighbors(xy, k=10):
+    """
+    Indices of the k nearest other locations for every location (n x k), via a KD-tree.
+    """
+    n = len(xy)
+    if n < 2:
+        raise ValueError(f"KNN weights need at least 2 locations, got {n}")
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    k = min(k, n - 1)
+    _, idx = cKDTree(xy).query(xy, k=k + 1)
+    # Drop each point itself by index: with duplicate coordinates it need not be the first hit,
+    # and when more than k other points share its location it is missing, so the last hit goes
+    is_self = idx == np.arange(n)[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    return idx[~is_self].reshape(n, k)
+
+
+def _pseudo_p(sims, observed, permutations):
+    """
+    Folded pseudo p-value as in esda: the smaller tail, (count + 1) / (permutations + 1).
+    """
+    larger = (sims >= observed).sum(axis=0)
+    larger = np.minimum(larger, permutations - larger)
+    return (larger + 1.0) / (permutations + 1.0)
+
+
+def global_moran(y, neighbors, permutations=999, seed=None, chunk=100):
+    """
+    Global Moran's I with row-standardized KNN weights and a permutation test.
+    """
+    z = np.asarray(y, dtype=float) - np.mean(y)
+    den = z @ z
+    moran_i = float(z @ z[neighbors].mean(axis=1) / den)
+    rng = np.random.default_rng(seed)
+    sims = np.empty(permutations)
+    for start in range(0, permutations, chunk):
+        size = min(chunk, permutations - start)
+        zp = rng.permuted(np.broadcast_to(z, (size, len(z))), axis=1)
+        sims[start:start + size] = (zp * zp[:, neighbors].mean(axis=2)).sum(axis=1) / den
+    return {
+        "I": moran_i,
+        "EI": -1.0 / (len(z) - 1),
+        "p_sim": float(_pseudo_p(sims[:, None], moran_i, permutations)[0]),
+        "z_sim": float((moran_i - sims.mean()) / sims.std()) if sims.std() > 0 else float("nan")
+    }
+
+
+def _init_worker(z, subsets):
+    global _worker_state
+    _worker_state = (z, subsets)
+
+
+def _local_sims(sites):
+    """
+    Conditional-permutation local Moran values for a block of sites (permutations x sites).
+    """
+    z, subsets = _worker_state
+    n = len(z)
+    den = z @ z
+    sims = np.empty((subsets.shape[0], len(sites)))
+    step = max(1, MAX_CHUNK_CELLS // subsets.size)
+    for start in range(0, len(sites), step):
+        block = sites[start:start + step]
+        # Shift the shared draws from range(n - 1) so that they skip the site itself
+        idx = subsets[None, :, :] + (subsets[None, :, :] >= block[:, None, None])
+        lag = z[idx].mean(axis=2)
+        sims[:, start:start + len(block)] = ((n - 1) * z[block][:, None] * lag / den).T
+    return sims
+
+
+def local_moran(y, neighbors, permutations=999, seed=None, processes=None, alpha=0.05):
+    """
+    Local Moran's I (LISA) per location with conditional permutation p-values and a
+    hotspot/coldspot/outlier label for the significant ones.
+    """
+    z = np.asarray(y, dtype=float) - np.mean(y)
+    n, k = neighbors.shape
+    lag = z[neighbors].mean(axis=1)
+    local_i = (n - 1) * z * lag / (z @ z)
+
+    rng = np.random.default_rng(seed)
+    subsets = np.stack([rng.choice(n - 1, size=k, replace=False) for _ in range(permutations)])
+    processes = min(processes or os.cpu_count() or 1, max(1, n // 1000))
+    blocks = np.array_split(np.arange(n), processes)
+    if processes == 1:
+        _init_worker(z, subsets)
+        sims = _local_sims(blocks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(z, subsets)) as pool:
+            sims = np.hstack(list(pool.map(_local_sims, blocks)))
+
+    p_sim = _pseudo_p(sims, local_i, permutations)
+    quadrant = np.select([(z > 0) & (lag > 0), (z <= 0) & (lag > 0), (z <= 0) & (lag <= 0)], [1, 2, 3], 4)
+    codes = np.array([QUADRANTS[q] for q in quadrant])
+    label = np.where(p_sim < alpha, [LABELS[c] for c in codes], "not significant")
+    return pd.DataFrame({"Is": local_i, "p_sim": p_sim, "quadrant": codes, "label": label})
+
+
+def accident_hotspots(easting, northing, k=10, permutations=999, seed=None, processes=None, alpha=0.05):
+    """
+    Aggregates accidents by location and runs global and local Moran's I on the counts.
+    Returns (global result dict, per-location DataFrame with LISA values and labels).
+    """
+    locations = aggregate_accidents(easting, northing)
+    neighbors = knn_neighbors(locations[["easting", "northing"]].to_numpy(), k=k)
+    counts = locations["count"].to_numpy()
+    result = global_moran(counts, neighbors, permutations=permutations, seed=seed)
+    lisa = local_moran(counts, neighbors, permutations=permutations, seed=seed, processes=processes, alpha=alpha)
+    return result, pd.concat([locations, lisa], axis=1)
@@ -1,47 +1,30 @@
 import osmnx as ox
-import pandas as pd
 import matplotlib.pyplot as plt
-from shapely.geometry import Point
-import geopandas as gpd
-from pyproj import Transformer
 import networkx as nx  # For planarity check
+from pyproj import Transformer
+from accident_data import accidents_to_gdf
+from accident_index import load_accident_index
+from osm_cache import load_road_graph
+from study_area import AreaFilter, hull_from_nodes
 
 # Set folder path where your CSV files are stored
 folder_path = "C:/Users/86153/Downloads/"
-file_names = [
-    "2014.csv",
-    "2015.csv",
-    "RTC2018_Leeds.csv",
-    "Trafficaccidents_2019_Leeds.csv"
-]
-
-# Read all accident data files (with appropriate encoding)
-df_list = [pd.read_csv(folder_path + name, encoding='latin1') for name in file_names]
-accidents = pd.concat(df_list, ignore_index=True)
-
-# Clean column names (lowercase and strip spaces)
-accidents.columns = [col.strip().lower() for col in accidents.columns]
-print("Column names after cleaning:", accidents.columns)
-
-# Drop rows with missing Easting/Northing values
-accidents = accidents.dropna(subset=['grid ref: easting', 'grid ref: northing'])
-
-# Convert OS National Grid (EPSG:27700) to Latitude/Longitude (EPSG:4326)
-transformer = Transformer.from_crs("epsg:27700", "epsg:4326", always_xy=True)
-accidents['longitude'], accidents['latitude'] = transformer.transform(
-    accidents['grid ref: easting'].values,
-    accidents['grid ref: northing'].values
-)
-
-# Create a GeoDataFrame from the accident data
-geometry = [Point(xy) for xy in zip(accidents['longitude'], accidents['latitude'])]
-gdf = gpd.GeoDataFrame(accidents, geometry=geometry, crs="EPSG:4326")
+
+# Read all accident data files into the normalized schema and index them for queries
+# (see accident_data.py and accident_index.py); both are cached after the first run
+index = load_accident_index(folder_path)
+accidents = index.frame
+print("Normalized column names:", accidents.columns)
+
+# Create a GeoDataFrame in Latitude/Longitude (EPSG:4326), dropping rows without coordinates
+gdf = accidents_to_gdf(accidents, crs="EPSG:4326")
 
 # Define the central point of Leeds (latitude, longitude)
 center_point = (53.7965, -1.5478)
 
 # Download the drivable road network within 1 km of Leeds centre
-G = ox.graph_from_point(center_point, dist=1000, network_type='drive', simplify=True)
+# Cached on disk after the first download (see osm_cache.py)
+G = load_road_graph(center_point, dist=1000, network_type='drive', simplify=True)
 
 # Calculate and display basic network statistics
 stats = ox.basic_stats(G)
@@ -60,15 +43,20 @@ print(f"\n✅ Is the network planar? {is_planar}")
 if not is_planar:
     print("Explanation: The network includes overpasses or bridges, which introduce edge crossings, so it's non-planar.")
 
-# Get the nodes as a GeoDataFrame (no need to unpack since edges=False)
-nodes = ox.graph_to_gdfs(G, nodes=True, edges=False)
-# Compute the convex hull of the nodes to form a boundary polygon
-polygon = nodes.unary_union.convex_hull
+# Compute the convex hull of the node coordinates to form a boundary polygon
+polygon = hull_from_nodes(G)
 
-# Filter accidents within the polygon (Leeds centre area)
-accidents_within = gdf[gdf.geometry.within(polygon)]
+# Filter accidents within the polygon (Leeds centre area) using a reusable spatial index
+accidents_within = AreaFilter(gdf).within(polygon)
 print(f"\n✅ Number of accidents within the selected area: {len(accidents_within)}")
 
+# Example index query: serious/fatal casualties on A roads with a wet surface within 500 m of
+# the centre point, 2018-2019 (coordinates in British National Grid metres)
+center_bng = Transformer.from_crs("EPSG:4326", "EPSG:27700", always_xy=True).transform(center_point[1], center_point[0])
+serious_wet = index.query(center=center_bng, radius=500, start="2018-01-01", end="2019-12-31",
+                          casualty_severity=["Serious", "Fatal"], road_class="A", road_surface="Wet / Damp")
+print(f"✅ Serious/fatal casualties on wet A roads within 500 m (2018-2019): {len(serious_wet)}")
+
 # Plot accidents on top of the road network
 fig, ax = plt.subplots(figsize=(10, 10))
 # Plot the road network
@@ -0,0 +1,62 @@
+# study_area.py
+# Cheap study-area construction and point-in-area filtering for the accident data.
+#
+# The spatial scripts built the study area with unary_union(...).convex_hull over every edge
+# or node and then ran gdf.geometry.within(polygon) over every accident. The convex hull of a
+# union equals the hull of all its vertices, so the hulls here are taken straight from the
+# coordinate arrays. AreaFilter indexes the points once in an STRtree: a query first
+# prefilters by bounding box and then tests the candidates against the prepared polygon, and
+# the index is reused for any number of areas (hulls, Voronoi cells, boroughs).
+
+import numpy as np
+import shapely
+
+
+def hull_from_nodes(G):
+    """
+    Convex hull of the node coordinates of an OSMnx graph (same as nodes.unary_union.convex_hull).
+    """
+    xy = np.array([(data["x"], data["y"]) for _, data in G.nodes(data=True)])
+    return shapely.convex_hull(shapely.multipoints(xy))
+
+
+def hull_from_geometries(geometries):
+    """
+    Convex hull of every vertex of the given geometries (same as geometries.unary_union.convex_hull).
+    """
+    return shapely.convex_hull(shapely.multipoints(shapely.get_coordinates(np.asarray(geometries))))
+
+
+class AreaFilter:
+    """
+    Reusable point index for selecting the points of a GeoDataFrame inside polygons.
+    Polygons must be in the CRS of the points.
+    """
+
+    def __init__(self, gdf):
+        self.gdf = gdf
+        self.points = np.asarray(gdf.geometry.values)
+        self.tree = shapely.STRtree(self.points)
+
+    def positions_within(self, polygon):
+        """
+        Sorted integer positions of the points strictly inside `polygon` (as GeoSeries.within).
+        """
+        return np.sort(self.tree.query(polygon, predicate="contains"))
+
+    def within(self, polygon):
+        """
+        Rows of the indexed GeoDataFrame inside `polygon`.
+        """
+        return self.gdf.iloc[self.positions_within(polygon)]
+
+    def assign(self, polygons):
+        """
+        For a sequence of polygons (e.g. Voronoi cells), the position of the polygon containing
+        each point, or -1 where none does (first polygon wins on overlaps).
+        """
+        polygon_ids, point_ids = self.tree.query(np.asarray(polygons), predicate="contains")
+        labels = np.full(len(self.points), -1, dtype=np.int64)
+        # Reverse order so that the first containing polygon is written last
+        labels[point_ids[::-1]] = polygon_ids[::-1]
+        return labels
@@ -3,33 +3,31 @@
 
 import networkx as nx
 import matplotlib.pyplot as plt
+from prov_store import ProvGraph
 
 # --- Step 1: Build PROV-style Network for Marathons in Leeds ---
 
-G = nx.DiGraph()
+# Typed nodes and labelled edges in a scalable store (see prov_store.py)
+prov = ProvGraph()
 
 # Define Entities, Activities, and Agents
 entities = ['MarathonRoute', 'VolunteerList', 'TrafficReport']
 activities = ['OrganiseMarathon', 'EvaluateSafety', 'AssignVolunteers']
 agents = ['MayorOffice', 'SafetyOfficer', 'VolunteerTeam']
 
-for e in entities:
-    G.add_node(e, type='entity')
-for a in activities:
-    G.add_node(a, type='activity')
-for ag in agents:
-    G.add_node(ag, type='agent')
+prov.add_nodes(entities, 'entity')
+prov.add_nodes(activities, 'activity')
+prov.add_nodes(agents, 'agent')
 
 # Add PROV relationships
-G.add_edge('MayorOffice', 'OrganiseMarathon', label='wasAssociatedWith')
-G.add_edge('OrganiseMarathon', 'MarathonRoute', label='used')
-G.add_edge('OrganiseMarathon', 'VolunteerList', label='generated')
-G.add_edge('SafetyOfficer', 'EvaluateSafety', label='wasAssociatedWith')
-G.add_edge('EvaluateSafety', 'TrafficReport', label='used')
-G.add_edge('VolunteerTeam', 'AssignVolunteers', label='wasAssociatedWith')
-G.add_edge('AssignVolunteers', 'VolunteerList', label='used')
-
-# Visualization
+prov.add_edges(['MayorOffice', 'SafetyOfficer', 'VolunteerTeam'],
+               ['OrganiseMarathon', 'EvaluateSafety', 'AssignVolunteers'], 'wasAssociatedWith')
+prov.add_edges(['OrganiseMarathon', 'EvaluateSafety', 'AssignVolunteers'],
+               ['MarathonRoute', 'TrafficReport', 'VolunteerList'], 'used')
+prov.add_edge('OrganiseMarathon', 'VolunteerList', 'generated')
+
+# Visualization (small graph, so a networkx copy is fine for drawing)
+G = prov.to_networkx()
 pos = nx.spring_layout(G, seed=42)
 node_colors = ['skyblue' if G.nodes[n]['type'] == 'entity' else 'lightgreen' if G.nodes[n]['type'] == 'activity' else 'salmon' for n in G.nodes()]
 labels = nx.get_edge_attributes(G, 'label')
@@ -42,33 +40,44 @@ plt.show()
 
 # --- Step 2: Compute PageRank on the PROV Network ---
 
-pagerank = nx.pagerank(G, alpha=0.85)
+# Sparse power iteration; later calls warm-start from this vector after new relations
+pagerank = prov.pagerank(alpha=0.85)
 
 print("\n🔎 PageRank results:")
-for node, value in sorted(pagerank.items(), key=lambda x: x[1], reverse=True):
+for node, value in pagerank.sort_values(ascending=False).items():
+    print(f"{node}: {value:.4f}")
+
+# Personalized PageRank: importance as seen from the agents responsible for the marathon
+agent_rank = prov.pagerank(alpha=0.85, node_types=['agent'])
+
+print("\n🔎 Agent-personalized PageRank results:")
+for node, value in agent_rank.sort_values(ascending=False).items():
     print(f"{node}: {value:.4f}")
 
 # --- Step 3: Train TransE on CoDExMedium and Visualise Embeddings ---
 
-# Run this only if pykeen and torch are installed.
+# Training needs pykeen and torch; once a checkpoint is cached they are no longer imported.
 try:
-    from pykeen.datasets import CoDExMedium
-    from pykeen.pipeline import pipeline
-    from sklearn.decomposition import PCA
-    import numpy as np
+    from embedding_cache import cached_embeddings, project_2d
 
-    result = pipeline(
-        dataset=CoDExMedium,
-        model='TransE',
-        training_kwargs=dict(num_epochs=100),
-    )
+    def train_transe():
+        from pykeen.datasets import CoDExMedium
+        from pykeen.pipeline import pipeline
 
-    entity_embeddings = result.model.entity_representations[0]().detach().numpy()
-    entities = list(result.training.entity_labeling.label_to_id.keys())
+        result = pipeline(
+            dataset=CoDExMedium,
+            model='TransE',
+            training_kwargs=dict(num_epochs=100),
+        )
+        label_to_id = result.training.entity_labeling.label_to_id
+        embeddings = result.model.entity_representations[0]().detach().numpy()
+        return embeddings, sorted(label_to_id, key=label_to_id.get)
 
-    # Reduce dimensions for plotting
-    pca = PCA(n_components=2)
-    reduced = pca.fit_transform(entity_embeddings)
+    # Trained once per dataset/model/hyperparameters, then memory-mapped from .cache/embeddings
+    checkpoint = cached_embeddings('CoDExMedium', 'TransE', train_transe, num_epochs=100)
+
+    # Reduce dimensions for plotting, streaming the rows through an incremental PCA
+    reduced = project_2d(checkpoint.embeddings)
 
     plt.figure(figsize=(10, 8))
     plt.scatter(reduced[:, 0], reduced[:, 1], alpha=0.5)
@@ -78,5 +87,11 @@ try:
     plt.grid(True)
     plt.show()
 
+    # Approximate nearest neighbours through the cached IVF index
+    example = checkpoint.labels[0]
+    print(f"\n🔎 Entities most similar to {example}:")
+    for label, distance in checkpoint.similar(example, k=5):
+        print(f"{label}: {distance:.4f}")
+
 except ImportError:
     print("\n⚠️ PyKEEN or torch not installed. Please install them with `pip install pykeen torch` to run TransE embedding.")
@@ -0,0 +1,25 @@
+# test_centrality.py
+# Regression checks: exact-mode betweenness and harmonic closeness against networkx.
+
+import networkx as nx
+import pytest
+from centrality import sampled_betweenness_closeness
+
+GRAPHS = {
+    "karate": nx.karate_club_graph(),
+    "two_components": nx.union(nx.path_graph(6), nx.cycle_graph(range(6, 13))),
+    "powerlaw_cluster": nx.powerlaw_cluster_graph(300, 3, 0.2, seed=5)
+}
+
+
+@pytest.mark.parametrize("name", sorted(GRAPHS))
+def test_exact_mode_matches_networkx(name):
+    G = GRAPHS[name]
+    result = sampled_betweenness_closeness(G, exact_threshold=1000, processes=1)
+    table = result["centrality"]
+    betweenness = nx.betweenness_centrality(G)
+    harmonic = nx.harmonic_centrality(G)
+    assert result["exact"]
+    for node in G:
+        assert table.loc[node, "betweenness"] == pytest.approx(betweenness[node], abs=1e-12)
+        assert table.loc[node, "harmonic"] == pytest.approx(harmonic[node], abs=1e-12)
@@ -0,0 +1,30 @@
+# test_clustering.py
+# Regression checks: sparse triangle counting against networkx.
+
+import networkx as nx
+import pytest
+from clustering import clustering_summary
+from graph_store import CSRGraph
+
+GRAPHS = {
+    "karate": nx.karate_club_graph(),
+    "gnm": nx.gnm_random_graph(300, 2000, seed=1),
+    "powerlaw_cluster": nx.powerlaw_cluster_graph(500, 4, 0.3, seed=2),
+    "with_isolates": nx.union(nx.complete_graph(5), nx.empty_graph(range(5, 9)))
+}
+
+
+@pytest.mark.parametrize("name", sorted(GRAPHS))
+def test_matches_networkx(name):
+    G = GRAPHS[name]
+    summary = clustering_summary(G)
+    expected = nx.clustering(G)
+    assert all(summary["local"][n] == pytest.approx(expected[n], abs=1e-12) for n in G)
+    assert summary["average_clustering"] == pytest.approx(nx.average_clustering(G), abs=1e-12)
+    assert summary["transitivity"] == pytest.approx(nx.transitivity(G), abs=1e-12)
+    assert summary["triangles"] == sum(nx.triangles(G).values()) // 3
+
+
+def test_csr_store_gives_same_summary():
+    G = GRAPHS["powerlaw_cluster"]
+    assert clustering_summary(CSRGraph.from_networkx(G)) == clustering_summary(G)
@@ -0,0 +1,47 @@
+# test_network_construction.py
+# Regression checks: the sparse incidence builder against the original pairwise loop.
+
+import os
+import networkx as nx
+import pandas as pd
+import pytest
+from benchmark import synthetic_threads
+from network_construction import build_network
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def loop_build_network(df):
+    """
+    The original builder: link every pair of editors in each (page, thread) group, counting
+    the shared threads.
+    """
+    G = nx.Graph()
+    for _, group in df.groupby(["page_name", "thread_subject"]):
+        users = group["username"].unique()
+        for i, user1 in enumerate(users):
+            for user2 in users[i + 1:]:
+                weight = G[user1][user2]["weight"] + 1 if G.has_edge(user1, user2) else 1
+                G.add_edge(user1, user2, weight=weight)
+    return G
+
+
+def _assert_same_network(G, H):
+    assert set(G.nodes) == set(H.nodes)
+    assert {frozenset(e) for e in G.edges} == {frozenset(e) for e in H.edges}
+    assert all(G[u][v]["weight"] == H[u][v]["weight"] for u, v in H.edges)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_matches_loop_builder_on_synthetic_threads(seed):
+    df = synthetic_threads(3000, seed=seed)
+    _assert_same_network(build_network(df), loop_build_network(df))
+
+
+@pytest.mark.parametrize("file_name", ["ADMINISTRATORS.csv", "BOT_REQUESTS.csv"])
+def test_matches_loop_builder_on_dumps(file_name):
+    path = os.path.join(HERE, file_name)
+    if not os.path.exists(path):
+        pytest.skip(f"{file_name} not available")
+    df = pd.read_csv(path)
+    _assert_same_network(build_network(df), loop_build_network(df))
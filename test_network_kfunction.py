@@ -0,0 +1,63 @@
+# test_network_kfunction.py
+# Regression checks: the banded K-function and KDE against brute-force Dijkstra on a graph
+# with every event inserted as a node.
+
+import networkx as nx
+import numpy as np
+import pytest
+from benchmark import planar_road_graph, synthetic_accidents
+from edge_snapping import snap_points
+from network_kfunction import KERNELS, network_k_function, network_kde
+
+
+def _graph_with_events(G_proj, snapped):
+    """
+    Undirected graph (shortest parallel edge per node pair) with each event spliced into its
+    segment at its offset; event nodes are ("event", i).
+    """
+    H = nx.Graph()
+    for u, v, d in G_proj.edges(data=True):
+        if u != v and (not H.has_edge(u, v) or d["length"] < H[u][v]["length"]):
+            H.add_edge(u, v, length=d["length"])
+    on_segment = {}
+    for i, (u, v, offset) in enumerate(zip(snapped["u"], snapped["v"], snapped["offset"])):
+        # Offsets are measured from u along the snapped edge
+        low, high = sorted((u, v))
+        position = offset if u == low else H[u][v]["length"] - offset
+        on_segment.setdefault((low, high), []).append((position, ("event", i)))
+    for (low, high), events in on_segment.items():
+        length = H[low][high]["length"]
+        H.remove_edge(low, high)
+        chain = [(0.0, low)] + sorted(events) + [(length, high)]
+        for (a, x), (b, y) in zip(chain[:-1], chain[1:]):
+            H.add_edge(x, y, length=b - a)
+    return H
+
+
+@pytest.fixture(scope="module")
+def road_events():
+    G = planar_road_graph(120, extent=1500.0, seed=3)
+    x, y = synthetic_accidents(G, 60, seed=4)
+    snapped = snap_points(G, x, y)
+    H = _graph_with_events(G, snapped)
+    events = [("event", i) for i in range(len(snapped))]
+    distances = {e: nx.single_source_dijkstra_path_length(H, e, weight="length") for e in events}
+    return G, snapped, events, distances
+
+
+def test_k_function_pair_counts_match_brute_force(road_events):
+    G, snapped, events, distances = road_events
+    radii = np.array([50.0, 100.0, 200.0, 400.0, 800.0])
+    result = network_k_function(G, snapped, radii, cache_dir=None)
+    expected = [sum(distances[a].get(b, np.inf) <= r for a in events for b in events if a != b) for r in radii]
+    assert result["pairs"].tolist() == expected
+
+
+def test_kde_matches_brute_force(road_events):
+    G, snapped, events, distances = road_events
+    bandwidth = 300.0
+    density = network_kde(G, snapped, bandwidth, cache_dir=None)
+    for node in G.nodes:
+        d = np.array([distances[e].get(node, np.inf) for e in events])
+        d = d[d < bandwidth]
+        assert density[node] == pytest.approx((KERNELS["quartic"](d / bandwidth) / bandwidth).sum(), abs=1e-12)
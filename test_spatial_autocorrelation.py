@@ -0,0 +1,77 @@
+# test_spatial_autocorrelation.py
+# Regression checks: KNN weights and Moran statistics against dense reference formulas, and
+# against esda when it is installed.
+
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist
+from spatial_autocorrelation import QUADRANTS, global_moran, knn_neighbors, local_moran
+
+
+@pytest.fixture(scope="module")
+def clustered_counts():
+    rng = np.random.default_rng(7)
+    xy = rng.random((400, 2)) * 1000
+    # Counts rise towards one corner, so there is real positive autocorrelation
+    counts = rng.poisson(1 + 5 * np.exp(-np.hypot(*(xy - 200).T) / 200))
+    return xy, counts.astype(float)
+
+
+def _row_standardized(neighbors):
+    n, k = neighbors.shape
+    W = np.zeros((n, n))
+    W[np.repeat(np.arange(n), k), neighbors.ravel()] = 1.0 / k
+    return W
+
+
+def test_knn_matches_brute_force(clustered_counts):
+    xy, _ = clustered_counts
+    neighbors = knn_neighbors(xy, k=6)
+    d = cdist(xy, xy)
+    np.fill_diagonal(d, np.inf)
+    assert np.array_equal(np.sort(neighbors, axis=1), np.sort(np.argsort(d, axis=1)[:, :6], axis=1))
+
+
+def test_knn_never_lists_a_point_as_its_own_neighbour():
+    xy = np.array([[0, 0], [0, 0], [0, 0], [1, 1], [5, 5]], dtype=float)
+    for k in (1, 2, 10):
+        neighbors = knn_neighbors(xy, k=k)
+        assert neighbors.shape == (5, min(k, 4))
+        assert not (neighbors == np.arange(5)[:, None]).any()
+
+
+def test_knn_needs_two_locations():
+    with pytest.raises(ValueError):
+        knn_neighbors(np.zeros((1, 2)))
+
+
+def test_moran_statistics_match_dense_formulas(clustered_counts):
+    xy, counts = clustered_counts
+    neighbors = knn_neighbors(xy, k=8)
+    W = _row_standardized(neighbors)
+    z = counts - counts.mean()
+    n = len(z)
+
+    result = global_moran(counts, neighbors, permutations=99, seed=0)
+    assert result["I"] == pytest.approx(z @ W @ z / (z @ z), abs=1e-12)
+    assert result["EI"] == pytest.approx(-1 / (n - 1))
+    assert result["p_sim"] < 0.05
+
+    lisa = local_moran(counts, neighbors, permutations=99, seed=0, processes=1)
+    assert np.allclose(lisa["Is"], (n - 1) * z * (W @ z) / (z @ z), atol=1e-12)
+    assert lisa["p_sim"].between(0, 1).all()
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_moran_statistics_match_esda(clustered_counts):
+    esda = pytest.importorskip("esda")
+    weights = pytest.importorskip("libpysal.weights")
+    xy, counts = clustered_counts
+    neighbors = knn_neighbors(xy, k=8)
+    w = weights.W({i: row.tolist() for i, row in enumerate(neighbors)})
+    w.transform = "r"
+    assert global_moran(counts, neighbors, permutations=99, seed=0)["I"] == pytest.approx(esda.Moran(counts, w).I)
+    reference = esda.Moran_Local(counts, w, permutations=99)
+    lisa = local_moran(counts, neighbors, permutations=99, seed=0, processes=1)
+    assert np.allclose(lisa["Is"], reference.Is)
+    assert lisa["quadrant"].tolist() == [QUADRANTS[q] for q in reference.q]